@@ -0,0 +1,59 @@
+"""
+Times DAWG serialization and deserialization on growing slices of a word list.
+
+Run from the repository root, e.g.:
+
+    python benchmarks/dawg_serialization.py ../data/CSW24.txt
+
+Per-node times that stay flat as the lexicon grows show linear scaling.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logic.dawg import DAWG, FlatDAWG
+
+
+def time_call(func, *args) -> float:
+    start_time = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("word_list", help="Plain text word list, one word per line")
+    parser.add_argument("--steps", type=int, default=4, help="Number of lexicon sizes to time")
+    args = parser.parse_args()
+
+    with open(args.word_list, "r") as file:
+        words = sorted({line.strip().upper() for line in file if line.strip()})
+
+    print(f"{'words':>9} {'nodes':>9} {'format':>8} {'ser (s)':>9} {'deser (s)':>10} {'ser us/node':>12} {'deser us/node':>14}")
+    for step in range(1, args.steps + 1):
+        count = len(words) * step // args.steps
+        dawg = DAWG()
+        for word in words[:count]:
+            dawg.insert(word)
+        node_count, _ = dawg.count_nodes_and_edges()
+
+        for name, serialize, load in (
+            ("legacy", lambda: dawg.serialize(legacy=True), lambda data: DAWG().deserialize(data)),
+            ("node", dawg.serialize, lambda data: DAWG().deserialize(data)),
+            ("flat", dawg.serialize_flat, FlatDAWG),
+        ):
+            start_time = time.perf_counter()
+            data = serialize()
+            serialize_time = time.perf_counter() - start_time
+            deserialize_time = time_call(load, data)
+            print(
+                f"{count:>9} {node_count:>9} {name:>8} {serialize_time:>9.3f} {deserialize_time:>10.3f} "
+                f"{1e6 * serialize_time / node_count:>12.2f} {1e6 * deserialize_time / node_count:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
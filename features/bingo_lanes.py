@@ -1,8 +1,13 @@
-from typing import List, Tuple
-from game_logic.types import Board, CrossCheckBoard
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from game_logic.types import (
+    Board, AnyCrossCheckBoard, PackedCrossCheckBoard, CROSS_CHECK_PRESENT, CROSS_CHECK_OPEN, cross_check_grids
+)
 
 def compute_7_letter_bingo_lanes(
-    board: Board, crosscheck_board_h: CrossCheckBoard, crosscheck_board_v: CrossCheckBoard
+    board: Board, crosscheck_board_h: AnyCrossCheckBoard, crosscheck_board_v: AnyCrossCheckBoard
 ) -> List[Tuple[int, int, str, int]]:
     """
     Computes 7-letter bingo lanes by checking valid cross-check spaces.
@@ -10,8 +15,8 @@ def compute_7_letter_bingo_lanes(
 
     Args:
         board (Board): The Scrabble board (15x15 grid).
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
 
     Returns:
         List[Tuple[int, int, str, int]]: A list of (row, col, direction, lane_size) tuples.
@@ -22,14 +27,16 @@ def compute_7_letter_bingo_lanes(
         return [(7, 7, "H", 1)]
 
     bingo_lanes = []
+    masks_h, flags_h = cross_check_grids(crosscheck_board_h)
+    masks_v, flags_v = cross_check_grids(crosscheck_board_v)
 
-    def is_valid_bingo_start(r, c, crosscheck_board, direction):
+    def is_valid_bingo_start(r, c, masks, flags, direction):
         """Checks if a space is a valid starting point for a 7-letter bingo."""
         if board[r][c] is not None:
             return False  # Cannot play through an existing tile
-        if crosscheck_board[r][c] is None or crosscheck_board[r][c].is_open_square:
+        if not flags[r][c] or flags[r][c] & CROSS_CHECK_OPEN:
             return False  # Must be a constrained space
-        if len(crosscheck_board[r][c].valid_letters) == 0:
+        if masks[r][c] == 0:
             return False  # No valid letters to play through
 
         # Ensure the space is not trapped between two tiles
@@ -42,7 +49,7 @@ def compute_7_letter_bingo_lanes(
 
         return True  # Valid starting point
 
-    def count_empty_spaces(r, c, dr, dc, crosscheck_board):
+    def count_empty_spaces(r, c, dr, dc, flags):
         """Counts empty spaces until hitting a tile or another cross-check."""
         count = 0
 
@@ -58,7 +65,7 @@ def compute_7_letter_bingo_lanes(
                 break  
 
             # Stop at the first cross-check (we only play through one)
-            if crosscheck_board[r_next][c_next] is not None:
+            if flags[r_next][c_next]:
                 break  
 
             count += 1  # Valid empty space
@@ -69,17 +76,17 @@ def compute_7_letter_bingo_lanes(
     for row in range(15):
         for col in range(15):
             # Check horizontal lanes
-            if is_valid_bingo_start(row, col, crosscheck_board_h, "H"):
-                left_spaces = count_empty_spaces(row, col, 0, -1, crosscheck_board_h)
-                right_spaces = count_empty_spaces(row, col, 0, 1, crosscheck_board_h)
+            if is_valid_bingo_start(row, col, masks_h, flags_h, "H"):
+                left_spaces = count_empty_spaces(row, col, 0, -1, flags_h)
+                right_spaces = count_empty_spaces(row, col, 0, 1, flags_h)
                 lane_size_h = max(0, left_spaces + right_spaces - 5)  # Need 6 open spaces around a tile
                 if lane_size_h > 0:
                     bingo_lanes.append((row, col, "H", lane_size_h))
 
             # Check vertical lanes
-            if is_valid_bingo_start(row, col, crosscheck_board_v, "V"):
-                up_spaces = count_empty_spaces(row, col, -1, 0, crosscheck_board_v)
-                down_spaces = count_empty_spaces(row, col, 1, 0, crosscheck_board_v)
+            if is_valid_bingo_start(row, col, masks_v, flags_v, "V"):
+                up_spaces = count_empty_spaces(row, col, -1, 0, flags_v)
+                down_spaces = count_empty_spaces(row, col, 1, 0, flags_v)
                 lane_size_v = max(0, up_spaces + down_spaces - 5)  # Need 6 open spaces around a tile
                 if lane_size_v > 0:
                     bingo_lanes.append((row, col, "V", lane_size_v))
@@ -89,28 +96,30 @@ def compute_7_letter_bingo_lanes(
 
 
 def compute_8_letter_bingo_lanes(
-    board: Board, crosscheck_board_h: CrossCheckBoard, crosscheck_board_v: CrossCheckBoard
+    board: Board, crosscheck_board_h: AnyCrossCheckBoard, crosscheck_board_v: AnyCrossCheckBoard
 ) -> List[Tuple[int, int, str, int]]:
     """
     Computes 8-letter bingo lanes by checking spaces around existing tiles.
 
     Args:
         board (Board): The Scrabble board (15x15 grid).
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
 
     Returns:
         List[Tuple[int, int, str, int]]: A list of (row, col, direction, lane_size) tuples.
     """
     bingo_lanes = []
+    masks_h, flags_h = cross_check_grids(crosscheck_board_h)
+    masks_v, flags_v = cross_check_grids(crosscheck_board_v)
 
-    def is_valid_extension(r, c, r_next, c_next, crosscheck_board):
+    def is_valid_extension(r, c, r_next, c_next, masks, flags):
         """Returns True if we can extend a word into this space and the next space."""
         if not (0 <= r < 15 and 0 <= c < 15):
             return False  # Out of bounds
         if board[r][c] is not None:
             return False  # Occupied
-        if crosscheck_board[r][c] is not None and len(crosscheck_board[r][c].valid_letters) == 0:
+        if flags[r][c] and masks[r][c] == 0:
             return False  # Cross-check restriction
         if 0 <= r_next < 15 and 0 <= c_next < 15 and (
             board[r_next][c_next] is not None
@@ -138,13 +147,13 @@ def compute_8_letter_bingo_lanes(
                 right_spaces = 0
 
                 for i in range(1, 8):
-                    if is_valid_extension(row, col - i, row, col - i - 1, crosscheck_board_h):
+                    if is_valid_extension(row, col - i, row, col - i - 1, masks_h, flags_h):
                         left_spaces += 1
                     else:
                         break
 
                 for i in range(1, 8):
-                    if is_valid_extension(row, col + i, row, col + i + 1, crosscheck_board_h):
+                    if is_valid_extension(row, col + i, row, col + i + 1, masks_h, flags_h):
                         right_spaces += 1
                     else:
                         break
@@ -159,13 +168,13 @@ def compute_8_letter_bingo_lanes(
                 down_spaces = 0
 
                 for i in range(1, 8):
-                    if is_valid_extension(row - i, col, row - i - 1, col, crosscheck_board_v):
+                    if is_valid_extension(row - i, col, row - i - 1, col, masks_v, flags_v):
                         up_spaces += 1
                     else:
                         break
 
                 for i in range(1, 8):
-                    if is_valid_extension(row + i, col, row + i + 1, col, crosscheck_board_v):
+                    if is_valid_extension(row + i, col, row + i + 1, col, masks_v, flags_v):
                         down_spaces += 1
                     else:
                         break
@@ -175,3 +184,134 @@ def compute_8_letter_bingo_lanes(
                     bingo_lanes.append((row, col, "V", lane_size_v))
 
     return bingo_lanes
+
+
+BatchLanes = Union[np.ndarray, Tuple[np.ndarray, List[List[Tuple[int, int, str, int]]]]]
+
+
+def compute_7_letter_bingo_lanes_batch(
+    occupied: np.ndarray,
+    crosscheck_boards_h: PackedCrossCheckBoard,
+    crosscheck_boards_v: PackedCrossCheckBoard,
+    return_lanes: bool = False,
+) -> BatchLanes:
+    """
+    Batch version of `compute_7_letter_bingo_lanes` for N boards at once.
+
+    Args:
+        occupied (np.ndarray): (N, 15, 15) occupancy, boolean or packed square codes
+            (anything non-zero is a tile, see parse_run_tile_batch).
+        crosscheck_boards_h (PackedCrossCheckBoard): Stacked horizontal cross-checks (arrays of shape (N, 15, 15)).
+        crosscheck_boards_v (PackedCrossCheckBoard): Stacked vertical cross-checks.
+        return_lanes (bool): Also return each board's lane list.
+
+    Returns:
+        np.ndarray: (N,) int32 lane size totals, the sum of the lane sizes
+        `compute_7_letter_bingo_lanes` reports for each board; with
+        `return_lanes`, a (totals, lane lists) tuple.
+    """
+    occupied = np.asarray(occupied) != 0
+    sizes = np.stack([
+        _lane_sizes_7(occupied, crosscheck_boards_h.letter_masks, crosscheck_boards_h.flags),
+        _lane_sizes_7(
+            occupied.swapaxes(1, 2), crosscheck_boards_v.letter_masks.swapaxes(1, 2), crosscheck_boards_v.flags.swapaxes(1, 2)
+        ).swapaxes(1, 2),
+    ], axis=-1)
+
+    # If board is empty, the only valid lane is (7, 7, "H", 1)
+    empty = ~occupied[:, 7, 7]
+    sizes[empty] = 0
+    sizes[empty, 7, 7, 0] = 1
+
+    return _lane_results(sizes, return_lanes)
+
+
+def compute_8_letter_bingo_lanes_batch(
+    occupied: np.ndarray,
+    crosscheck_boards_h: PackedCrossCheckBoard,
+    crosscheck_boards_v: PackedCrossCheckBoard,
+    return_lanes: bool = False,
+) -> BatchLanes:
+    """
+    Batch version of `compute_8_letter_bingo_lanes` for N boards at once.
+
+    Args:
+        occupied (np.ndarray): (N, 15, 15) occupancy, boolean or packed square codes.
+        crosscheck_boards_h (PackedCrossCheckBoard): Stacked horizontal cross-checks (arrays of shape (N, 15, 15)).
+        crosscheck_boards_v (PackedCrossCheckBoard): Stacked vertical cross-checks.
+        return_lanes (bool): Also return each board's lane list.
+
+    Returns:
+        np.ndarray: (N,) int32 lane size totals; with `return_lanes`, a
+        (totals, lane lists) tuple (see `compute_7_letter_bingo_lanes_batch`).
+    """
+    occupied = np.asarray(occupied) != 0
+    sizes = np.stack([
+        _lane_sizes_8(occupied, crosscheck_boards_h.letter_masks, crosscheck_boards_h.flags),
+        _lane_sizes_8(
+            occupied.swapaxes(1, 2), crosscheck_boards_v.letter_masks.swapaxes(1, 2), crosscheck_boards_v.flags.swapaxes(1, 2)
+        ).swapaxes(1, 2),
+    ], axis=-1)
+
+    return _lane_results(sizes, return_lanes)
+
+
+def _lane_sizes_7(occupied: np.ndarray, masks: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """7-letter lane sizes along the rows (last axis) of a batch."""
+    # A constrained, playable, empty square with no tile on either side along the row
+    starts = ~occupied & (flags == CROSS_CHECK_PRESENT) & (masks != 0)
+    starts &= ~_shift(occupied, 1) & ~_shift(occupied, -1)
+
+    # Empty squares without a cross-check, up to 6 each way
+    free = ~occupied & (flags == 0)
+    lane_sizes = _run_length(free, 1, 6) + _run_length(free, -1, 6) - 5
+    return np.where(starts, np.maximum(lane_sizes, 0), 0).astype(np.int8)
+
+
+def _lane_sizes_8(occupied: np.ndarray, masks: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """8-letter lane sizes along the rows (last axis) of a batch."""
+    # A tile with no neighbouring tile along the row
+    starts = occupied & ~_shift(occupied, 1) & ~_shift(occupied, -1)
+
+    # Squares a word can be extended over: empty, no dead cross-check, and the
+    # square beyond (in the direction of travel) not occupied; up to 7 each way
+    open_square = ~occupied & ~((flags != 0) & (masks == 0))
+    left = _run_length(open_square & ~_shift(occupied, 1), 1, 7)
+    right = _run_length(open_square & ~_shift(occupied, -1), -1, 7)
+    return np.where(starts, np.maximum(left + right - 6, 0), 0).astype(np.int8)
+
+
+def _shift(values: np.ndarray, offset: int) -> np.ndarray:
+    """result[..., p] = values[..., p - offset], False where that falls off the board."""
+    result = np.zeros_like(values)
+    if offset > 0:
+        result[..., offset:] = values[..., :-offset]
+    else:
+        result[..., :offset] = values[..., -offset:]
+    return result
+
+
+def _run_length(condition: np.ndarray, offset: int, limit: int) -> np.ndarray:
+    """
+    Number of consecutive squares satisfying `condition` starting `offset` away
+    from each square and moving further in that direction, capped at `limit`.
+    """
+    run = np.zeros(condition.shape, dtype=np.int8)
+    unbroken = np.ones(condition.shape, dtype=bool)
+    for step in range(1, limit + 1):
+        unbroken &= _shift(condition, offset * step)
+        run += unbroken
+    return run
+
+
+def _lane_results(sizes: np.ndarray, return_lanes: bool) -> BatchLanes:
+    """Totals (and lane lists) from (N, 15, 15, 2) lane sizes, direction H then V."""
+    totals = sizes.sum(axis=(1, 2, 3), dtype=np.int32)
+    if not return_lanes:
+        return totals
+
+    # np.nonzero walks (board, row, col, direction) in order: row-major, "H" before "V"
+    lanes: List[List[Tuple[int, int, str, int]]] = [[] for _ in range(len(sizes))]
+    for board, row, col, direction in zip(*np.nonzero(sizes)):
+        lanes[board].append((int(row), int(col), "HV"[direction], int(sizes[board, row, col, direction])))
+    return totals, lanes
@@ -0,0 +1,259 @@
+from typing import Dict, List, Optional, Tuple
+
+from features.special_squares import SPECIAL_TILES_CONNECTIONS
+from game_logic.types import Board, AnyCrossCheckBoard, CROSS_CHECK_PRESENT, cross_check_grids
+from game_logic.utils import SPECIAL_TILES_LOCATIONS
+
+# (row, col, type) of the squares counted by compute_accessible_special_tiles
+_ACCESS_SQUARES = [
+    (row, col, SPECIAL_TILES_LOCATIONS[row][col])
+    for row in range(15) for col in range(15)
+    if SPECIAL_TILES_LOCATIONS[row][col] in {"TWS", "DWS"}
+]
+
+# (type, vertical, line, first, last) of every special connection, in line coordinates
+_CONNECTIONS = [
+    ("/".join(special_type), r1 != r2, c1 if r1 != r2 else r1, min(c1, c2) if r1 == r2 else min(r1, r2),
+     max(c1, c2) if r1 == r2 else max(r1, r2))
+    for special_type, pairs in SPECIAL_TILES_CONNECTIONS.items()
+    for (r1, c1), (r2, c2) in pairs
+]
+
+
+class _LineScan:
+    """
+    Everything the board features need to know about one row or column,
+    computed in one pass in each direction over its 15 squares.
+
+    The bingo lanes are read against one cross-check grid (`lane_masks`,
+    `lane_flags`) and the special-square reach and connection counts against
+    another (`masks`, `flags`), which may be the same.
+
+    Positions run left to right (rows) or top to bottom (columns); "back" is
+    towards position 0 and "forward" towards 14.
+    """
+    __slots__ = (
+        "lanes_7", "lanes_8", "reach_back", "reach_forward", "tiles_before", "valid_before", "dead_before",
+    )
+
+    def __init__(
+        self, occupied: List[bool], lane_masks: List[int], lane_flags: List[int], masks: List[int], flags: List[int],
+        board_empty: bool,
+    ):
+        self.lanes_7: List[Tuple[int, int]] = []
+        self.lanes_8: List[Tuple[int, int]] = []
+        self.reach_back = [False] * 15
+        self.reach_forward = [False] * 15
+        self.tiles_before = [0] * 16
+        self.valid_before = [0] * 16
+        self.dead_before = [0] * 16
+
+        if not any(occupied) and not any(flags) and not any(lane_flags):
+            return  # Nothing to reach, extend from or connect through
+
+        # Back pass. free_back / extend_back: run lengths, ending right before p, of squares
+        # with no tile and no cross-check (7-letter lanes) / squares a word can be extended
+        # over (8-letter lanes: no tile, no dead cross-check, no tile beyond).
+        # can_reach_within_7 is decided by the nearest tile or cross-check (open squares
+        # don't count) in that direction, provided it is at most 7 squares away.
+        free_back = [0] * 15
+        extend_back = [0] * 15
+        reach_back = self.reach_back
+        tiles_before, valid_before, dead_before = self.tiles_before, self.valid_before, self.dead_before
+        event, outcome = -8, False
+        for p in range(15):
+            if p:
+                q = p - 1
+                free_back[p] = free_back[q] + 1 if not occupied[q] and not lane_flags[q] else 0
+                extendable = (
+                    not occupied[q] and not (lane_flags[q] and lane_masks[q] == 0) and not (q and occupied[q - 1])
+                )
+                extend_back[p] = extend_back[q] + 1 if extendable else 0
+            reach_back[p] = outcome and p - event <= 7
+
+            tiles, valid, dead = tiles_before[p], valid_before[p], dead_before[p]
+            if occupied[p]:
+                event, outcome = p, not (p and occupied[p - 1])
+                tiles += 1
+            elif flags[p] == CROSS_CHECK_PRESENT:
+                event, outcome = p, masks[p] != 0 and not (p > 1 and occupied[p - 1] and occupied[p - 2])
+                if masks[p]:
+                    valid += 1
+                else:
+                    dead += 1
+            tiles_before[p + 1], valid_before[p + 1], dead_before[p + 1] = tiles, valid, dead
+
+        # Forward pass, mirrored; the lanes are complete once both runs are known
+        free_forward = extend_forward = 0
+        reach_forward = self.reach_forward
+        event, outcome = 22, False
+        for p in range(14, -1, -1):
+            if p < 14:
+                q = p + 1
+                free_forward = free_forward + 1 if not occupied[q] and not lane_flags[q] else 0
+                extendable = (
+                    not occupied[q] and not (lane_flags[q] and lane_masks[q] == 0)
+                    and not (q < 14 and occupied[q + 1])
+                )
+                extend_forward = extend_forward + 1 if extendable else 0
+            reach_forward[p] = outcome and event - p <= 7
+
+            isolated = not (p and occupied[p - 1]) and not (p < 14 and occupied[p + 1])
+            if occupied[p]:
+                event, outcome = p, not (p < 14 and occupied[p + 1])
+                if isolated:  # compute_8_letter_bingo_lanes: room to extend an isolated tile
+                    lane_size = min(extend_back[p], 7) + min(extend_forward, 7) - 6
+                    if lane_size > 0:
+                        self.lanes_8.append((p, lane_size))
+                continue
+
+            if flags[p] == CROSS_CHECK_PRESENT:
+                event, outcome = p, masks[p] != 0 and not (p < 13 and occupied[p + 1] and occupied[p + 2])
+            if lane_flags[p] == CROSS_CHECK_PRESENT:
+                # compute_7_letter_bingo_lanes: an isolated, playable, non-open cross-check
+                if isolated and lane_masks[p] and not board_empty:
+                    lane_size = min(free_back[p], 6) + min(free_forward, 6) - 5
+                    if lane_size > 0:
+                        self.lanes_7.append((p, lane_size))
+
+
+def extract_board_features(
+    board: Board,
+    cs_h: AnyCrossCheckBoard,
+    cs_v: AnyCrossCheckBoard,
+    lane_cross_checks: Optional[Tuple[AnyCrossCheckBoard, AnyCrossCheckBoard]] = None,
+) -> Dict:
+    """
+    Computes every board feature in one pass over the rows and columns.
+
+    Each row and each column is scanned once; quadrant counts, bingo lanes,
+    accessible special squares and special connections are all read off those
+    scans. The results are identical to the reference functions:
+    `count_tiles_in_quadrants(board)`,
+    `compute_accessible_special_tiles(board, cs_h, cs_v)`,
+    `compute_accessible_special_connections(board, cs_h, cs_v)` and
+    `compute_{7,8}_letter_bingo_lanes(board, *lane_cross_checks)`.
+
+    The bingo lanes take their own cross-check pair because the pipeline passes
+    the boards to the bingo functions in the other order: `parse_scrabble_line`
+    gets its columns with `lane_cross_checks=(cs_v, cs_h)` from the same scan.
+
+    Args:
+        board (Board): The Scrabble board (list of lists or PackedBoard).
+        cs_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        cs_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
+        lane_cross_checks (Optional[Tuple[AnyCrossCheckBoard, AnyCrossCheckBoard]]): The
+            (crosscheck_board_h, crosscheck_board_v) arguments of the bingo lane
+            functions; defaults to (cs_h, cs_v).
+
+    Returns:
+        Dict: The reference functions' outputs:
+            - "quadrant_counts": count_tiles_in_quadrants
+            - "7_letter_bingo_lanes_list" / "8_letter_bingo_lanes_list": the bingo lane lists
+            - "7_letter_bingos" / "8_letter_bingos": their summed lane sizes
+            - "accessible_special_tiles": compute_accessible_special_tiles
+            - "accessible_special_connections": compute_accessible_special_connections
+    """
+    occupied = [[tile is not None for tile in row] for row in board]
+    occupied_columns = [list(column) for column in zip(*occupied)]
+    masks_h, flags_h = cross_check_grids(cs_h)
+    masks_v, flags_v = cross_check_grids(cs_v)
+    if lane_cross_checks is None:
+        lane_masks_h, lane_flags_h, lane_masks_v, lane_flags_v = masks_h, flags_h, masks_v, flags_v
+    else:
+        lane_masks_h, lane_flags_h = cross_check_grids(lane_cross_checks[0])
+        lane_masks_v, lane_flags_v = cross_check_grids(lane_cross_checks[1])
+
+    def columns_of(grid):
+        return [list(column) for column in zip(*grid)]
+
+    board_empty = board[7][7] is None
+    rows = [
+        _LineScan(occupied[r], lane_masks_h[r], lane_flags_h[r], masks_h[r], flags_h[r], board_empty)
+        for r in range(15)
+    ]
+    columns = [
+        _LineScan(occupied_columns[c], lane_masks, lane_flags, masks, flags, board_empty)
+        for c, (lane_masks, lane_flags, masks, flags) in enumerate(zip(
+            columns_of(lane_masks_v), columns_of(lane_flags_v), columns_of(masks_v), columns_of(flags_v)
+        ))
+    ]
+
+    # Lanes come out row-major with "H" before "V", like the reference double loop
+    if board_empty:
+        lanes_7 = [(7, 7, "H", 1)]
+    else:
+        lanes_7 = sorted(
+            [(r, c, "H", size) for r in range(15) for c, size in rows[r].lanes_7] +
+            [(r, c, "V", size) for c in range(15) for r, size in columns[c].lanes_7]
+        )
+    lanes_8 = sorted(
+        [(r, c, "H", size) for r in range(15) for c, size in rows[r].lanes_8] +
+        [(r, c, "V", size) for c in range(15) for r, size in columns[c].lanes_8]
+    )
+
+    quadrant_counts = {"upper_left": 0, "upper_right": 0, "lower_left": 0, "lower_right": 0}
+    for r in range(15):
+        if r == 7:
+            continue
+        top = "upper" if r < 7 else "lower"
+        quadrant_counts[f"{top}_left"] += sum(occupied[r][:7])
+        quadrant_counts[f"{top}_right"] += sum(occupied[r][8:])
+
+    accessible = {"TWS": 0, "DWS": 0}
+    for r, c, tile_type in _ACCESS_SQUARES:
+        if masks_h[r][c] or masks_v[r][c]:
+            accessible[tile_type] += 1
+        elif not occupied[r][c] and not _is_blocked(occupied, r, c) and (
+            rows[r].reach_back[c] or rows[r].reach_forward[c] or
+            columns[c].reach_back[r] or columns[c].reach_forward[r]
+        ):
+            accessible[tile_type] += 1
+
+    connections = {"TWS/TWS": 0, "DWS/TLS": 0, "DWS/DWS": 0, "DLS/TWS": 0}
+    for special_type, vertical, line, first, last in _CONNECTIONS:
+        if _is_connected(columns[line] if vertical else rows[line], first, last, special_type):
+            connections[special_type] += 1
+
+    return {
+        "quadrant_counts": quadrant_counts,
+        "7_letter_bingo_lanes_list": lanes_7,
+        "7_letter_bingos": sum(lane[3] for lane in lanes_7),
+        "8_letter_bingo_lanes_list": lanes_8,
+        "8_letter_bingos": sum(lane[3] for lane in lanes_8),
+        "accessible_special_tiles": (accessible["TWS"], accessible["DWS"]),
+        "accessible_special_connections": connections,
+    }
+
+
+def _is_blocked(occupied: List[List[bool]], r: int, c: int) -> bool:
+    """Two tiles in a row on one side, or tiles on two sides (see is_accessible_special_tile)."""
+    left = c > 0 and occupied[r][c - 1]
+    right = c < 14 and occupied[r][c + 1]
+    up = r > 0 and occupied[r - 1][c]
+    down = r < 14 and occupied[r + 1][c]
+    if left + right + up + down >= 2:
+        return True
+    return (
+        (left and c > 1 and occupied[r][c - 2]) or (right and c < 13 and occupied[r][c + 2]) or
+        (up and r > 1 and occupied[r - 2][c]) or (down and r < 13 and occupied[r + 2][c])
+    )
+
+
+def _is_connected(line: _LineScan, first: int, last: int, special_type: str) -> bool:
+    """is_accessible_connection for the squares first..last of a row or column."""
+    tiles_before = line.tiles_before
+    if tiles_before[first + 1] - tiles_before[first] or tiles_before[last + 1] - tiles_before[last]:
+        return False  # A special square is occupied
+
+    if line.dead_before[last + 1] - line.dead_before[first]:
+        return False  # A cross-check with no valid letters
+
+    tiles = tiles_before[last] - tiles_before[first + 1]
+    cross_checks = line.valid_before[last + 1] - line.valid_before[first]
+
+    if tiles > 1 or cross_checks > 1 or tiles + cross_checks == 0:
+        return False
+    if special_type == "TWS/TWS":
+        return tiles == 1 and cross_checks == 0
+    return True
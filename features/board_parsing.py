@@ -1,4 +1,38 @@
-from game_logic.types import Board
+import re
+from typing import Dict, Iterable, Union
+
+import numpy as np
+
+from game_logic.types import Board, PackedBoard, BLANK_OFFSET
+
+_EMPTY_RUN = re.compile(r"[0-9]+")
+_EMPTY_SQUARES = re.compile(r"\.+")
+_UPPER = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = _UPPER.lower()
+# Run-tile text (with runs expanded to ".") <-> packed square codes
+_TEXT_TO_CODES = bytes.maketrans(
+    b"." + _UPPER + _LOWER, bytes([0]) + bytes(range(1, 27)) + bytes(range(1 + BLANK_OFFSET, 27 + BLANK_OFFSET))
+)
+_CODES_TO_TEXT = bytes.maketrans(
+    bytes([0]) + bytes(range(1, 27)) + bytes(range(1 + BLANK_OFFSET, 27 + BLANK_OFFSET)), b"." + _UPPER + _LOWER
+)
+_BOARD_TEXT = frozenset(b"." + _UPPER + _LOWER)
+# Byte -> square code for the batch decoder; anything that is not a square is 255
+_BYTE_TO_CODE = np.full(256, 255, dtype=np.uint8)
+_BYTE_TO_CODE[np.frombuffer(b"." + _UPPER + _LOWER, dtype=np.uint8)] = np.frombuffer(
+    (b"." + _UPPER + _LOWER).translate(_TEXT_TO_CODES), dtype=np.uint8
+)
+_VALID_BATCH_BOARD = "." * 15 + ("/" + "." * 15) * 14
+
+
+class BoardParseError(ValueError):
+    """Raised by the batch decoder; `errors` maps row index -> reason for every malformed row."""
+
+    def __init__(self, errors: Dict[int, str]):
+        self.errors = errors
+        shown = "; ".join(f"row {index}: {reason}" for index, reason in list(errors.items())[:5])
+        more = f" (and {len(errors) - 5} more)" if len(errors) > 5 else ""
+        super().__init__(f"{len(errors)} malformed board(s): {shown}{more}")
 
 def parse_run_tile_representation(data: str) -> Board:
     """
@@ -35,3 +69,140 @@ def parse_run_tile_representation(data: str) -> Board:
                 i += 1
 
     return board
+
+
+_EMPTY_RUN_TEXT = {str(count): "." * count for count in range(16)}
+
+
+def _expand_empty_runs(match: "re.Match") -> str:
+    run = match.group()
+    expanded = _EMPTY_RUN_TEXT.get(run)
+    return expanded if expanded is not None else "." * int(run)
+
+
+def expand_run_tile_representation(data: str) -> bytes:
+    """
+    Expands a run-tile string into 225 ASCII bytes, one per square ("." = empty).
+
+    Raises:
+        ValueError: If the string does not describe exactly 15 rows of 15 squares
+            of letters and empty-square counts.
+    """
+    text = _EMPTY_RUN.sub(_expand_empty_runs, data)
+
+    # Fast path: 15 rows of 15 squares put a slash at every 16th character.
+    if len(text) == 239 and text[15::16] == "/" * 14:
+        text = text.replace("/", "").encode("ascii", errors="replace")
+        if len(text) == 225 and _BOARD_TEXT.issuperset(text):
+            return text
+
+    rows = data.split("/")
+    if len(rows) != 15:
+        raise ValueError(f"Expected 15 rows, got {len(rows)}")
+
+    for row_index, row in enumerate(rows):
+        squares = len(_EMPTY_RUN.sub(_expand_empty_runs, row))
+        if squares != 15:
+            raise ValueError(f"Row {row_index} ({row!r}) has {squares} squares, expected 15")
+
+    bad = sorted({ch for ch in data if ch not in "/0123456789" and ord(ch) not in _BOARD_TEXT})
+    raise ValueError(f"Unexpected characters in board: {bad}")
+
+
+def parse_run_tile_packed(data: str) -> PackedBoard:
+    """
+    Parse a Scrabble run-tile representation straight into a PackedBoard.
+
+    Unlike `parse_run_tile_representation`, malformed input raises instead of
+    being skipped over.
+
+    Args:
+        data (str): The run-tile representation with rows separated by slashes.
+
+    Returns:
+        PackedBoard: The packed 15x15 board.
+    """
+    return PackedBoard(expand_run_tile_representation(data).translate(_TEXT_TO_CODES))
+
+
+def to_run_tile_representation(board: Union[Board, PackedBoard]) -> str:
+    """
+    Encode a board (list-of-lists or packed) as a run-tile string.
+
+    Args:
+        board (Union[Board, PackedBoard]): The board to encode.
+
+    Returns:
+        str: Rows separated by slashes, with runs of empty squares as counts.
+    """
+    if isinstance(board, PackedBoard):
+        text = board.data.translate(_CODES_TO_TEXT).decode("ascii")
+    else:
+        text = "".join("." if tile is None else tile for row in board for tile in row)
+
+    return "/".join(
+        _EMPTY_SQUARES.sub(lambda match: str(len(match.group())), text[row * 15:row * 15 + 15]) for row in range(15)
+    )
+
+
+def parse_run_tile_batch(boards: Iterable[str], chunk_size: int = 65536) -> np.ndarray:
+    """
+    Decode many run-tile strings into one contiguous uint8 array.
+
+    Boards are expanded a chunk at a time with a single regex pass over the
+    joined text, then mapped to square codes (see PackedBoard) through a byte
+    lookup table. `result != 0` gives the occupancy grids.
+
+    Args:
+        boards (Iterable[str]): Run-tile strings (list, NumPy array, pandas Series...).
+        chunk_size (int): Number of boards expanded per pass.
+
+    Returns:
+        np.ndarray: Array of shape (N, 15, 15) and dtype uint8.
+
+    Raises:
+        BoardParseError: If any board is malformed; lists every bad row and why.
+    """
+    boards = list(boards)
+    result = np.empty((len(boards), 15, 15), dtype=np.uint8)
+    errors: Dict[int, str] = {}
+
+    for start in range(0, len(boards), chunk_size):
+        chunk = boards[start:start + chunk_size]
+        expanded = _EMPTY_RUN.sub(_expand_empty_runs, "\n".join(chunk)).split("\n")
+
+        if len(expanded) != len(chunk):  # Newlines inside a board; expand one by one
+            expanded = [_EMPTY_RUN.sub(_expand_empty_runs, board) for board in chunk]
+
+        # Each good board is 15 rows of 15 squares joined by slashes: 239 characters
+        for offset, text in enumerate(expanded):
+            if len(text) != 239 or "\n" in text:
+                errors[start + offset] = _describe_board_error(chunk[offset])
+                expanded[offset] = _VALID_BATCH_BOARD
+
+        text = ("\n".join(expanded) + "\n").encode("ascii", errors="replace")
+        squares = np.frombuffer(text, dtype=np.uint8).reshape(len(chunk), 15, 16)
+
+        separators = squares[:, :, 15]
+        bad_separators = (separators[:, :14] != ord("/")).any(axis=1)
+        codes = _BYTE_TO_CODE[squares[:, :, :15]]
+        bad_squares = (codes == 255).any(axis=(1, 2))
+
+        for offset in np.flatnonzero(bad_separators | bad_squares):
+            if start + offset not in errors:
+                errors[start + int(offset)] = _describe_board_error(chunk[offset])
+
+        result[start:start + len(chunk)] = codes
+
+    if errors:
+        raise BoardParseError(dict(sorted(errors.items())))
+
+    return result
+
+
+def _describe_board_error(data: str) -> str:
+    try:
+        expand_run_tile_representation(data)
+    except ValueError as error:
+        return str(error)
+    return "malformed board"
@@ -1,15 +1,41 @@
+import multiprocessing
+import os
 import pandas as pd
 import numpy as np
 import time
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from features.board_parsing import parse_run_tile_representation
-from features.bingo_lanes import compute_8_letter_bingo_lanes, compute_7_letter_bingo_lanes
+from features.board_parsing import parse_run_tile_representation, parse_run_tile_batch
+from features.bingo_lanes import (
+    compute_8_letter_bingo_lanes, compute_7_letter_bingo_lanes,
+    compute_8_letter_bingo_lanes_batch, compute_7_letter_bingo_lanes_batch,
+)
+from features.position_cache import PositionCache, cached_cross_checks
+from features.tile_counts import tile_count_matrices
 
-from game_logic.utils import TILE_ORDER, TILE_DIST, transpose
-from game_logic.crosschecks import find_anchors_with_cross_checks
-from game_logic.dawg import DAWG
+from game_logic.utils import TILE_ORDER, TILE_DIST
+from game_logic.dawg import DAWG, Lexicon
+from game_logic.symmetry import READING_SYMMETRIES, dedupe_boards, inverse_symmetry, transform_cross_checks
+from game_logic.types import PackedBoard, PackedCrossCheckBoard
+from game_logic.zobrist import zobrist_hash_pair
+
+# Bump whenever a change to the feature code changes its output (invalidates feature caches)
+FEATURE_SET_VERSION = 2
+
+# Numeric columns produced by parse_scrabble_line, with their batch dtypes
+NUMERIC_COLUMNS: Dict[str, np.dtype] = {
+    "score_diff": np.dtype(np.int32),
+    "total_unseen_tiles": np.dtype(np.int16),
+    **{f"leave_{letter}": np.dtype(np.int8) for letter in TILE_ORDER},
+    **{f"unseen_{letter}": np.dtype(np.int8) for letter in TILE_ORDER},
+    "winProb": np.dtype(np.float64),
+    "expPointDiff": np.dtype(np.float64),
+    "8_letter_bingos": np.dtype(np.int32),
+    "7_letter_bingos": np.dtype(np.int32),
+    "possible": np.dtype(np.bool_),  # False if some unseen count is negative
+}
 
 def tile_vector(tiles: List[str]) -> np.ndarray:
     """
@@ -29,13 +55,16 @@ def tile_vector(tiles: List[str]) -> np.ndarray:
     return np.array([tile_counts[tile] for tile in TILE_ORDER], dtype=np.int32)
 
 
-def parse_scrabble_line(line: str, dawg: DAWG) -> Dict:
+def parse_scrabble_line(line: str, dawg: DAWG, cache: Optional[PositionCache] = None) -> Dict:
     """
     Parse a single line from the Scrabble dataset into structured features.
 
     Args:
         line (str): A single line from the dataset.
         dawg (DAWG): The DAWG dictionary for cross-check computations.
+        cache (Optional[PositionCache]): Shares cross-checks and bingo lanes
+            between lines with the same board (the rows then share those objects);
+            cross-checks are also shared with the transposed board.
 
     Returns:
         dict: A dictionary with structured Scrabble game state features.
@@ -63,16 +92,18 @@ def parse_scrabble_line(line: str, dawg: DAWG) -> Dict:
     for el in leave:
         unseen_tiles[el] -= 1
 
-    # Compute cross-checks
-    cs_h = find_anchors_with_cross_checks(board, dawg)
-    cs_v = transpose(find_anchors_with_cross_checks(transpose(board), dawg))
+    # One pass hashes the board and its transpose, for every cache lookup below
+    board_hashes = zobrist_hash_pair(board) if cache is not None else None
+    board_hash = board_hashes[0] if board_hashes is not None else None
 
-    # Compute 8-letter bingo lanes
-    bingo_lanes_8 = compute_8_letter_bingo_lanes(board, cs_v, cs_h)
-    total_bingos_8 = sum(lane[3] for lane in bingo_lanes_8)
+    # Compute cross-checks (packed: 1575 bytes of arrays per board instead of 225 objects)
+    cs_h, cs_v = cached_cross_checks(board, dawg, cache, board_hashes)
 
-    # Compute 7-letter bingo lanes
-    bingo_lanes_7 = compute_7_letter_bingo_lanes(board, cs_v, cs_h)
+    # Compute 8- and 7-letter bingo lanes
+    bingo_lanes_8, bingo_lanes_7 = _cached(cache, board_hash, "bingo_lanes", lambda: (
+        compute_8_letter_bingo_lanes(board, cs_v, cs_h), compute_7_letter_bingo_lanes(board, cs_v, cs_h)
+    ))
+    total_bingos_8 = sum(lane[3] for lane in bingo_lanes_8)
     total_bingos_7 = sum(lane[3] for lane in bingo_lanes_7)
 
     return {
@@ -90,16 +121,25 @@ def parse_scrabble_line(line: str, dawg: DAWG) -> Dict:
         "8_letter_bingos": total_bingos_8,
         "7_letter_bingo_lanes_list": bingo_lanes_7,
         "7_letter_bingos": total_bingos_7,
+        "possible": all(unseen_tiles[letter] >= 0 for letter in TILE_ORDER),
     }
 
 
-def load_scrabble_data(file_path: str, dawg: DAWG) -> pd.DataFrame:
+def load_scrabble_data(
+    file_path: str, dawg: Lexicon, workers: int = 1, chunks_per_worker: int = 4, cache_size: int = 4096
+) -> pd.DataFrame:
     """
     Loads and processes the Scrabble dataset from a file.
 
     Args:
         file_path (str): Path to the dataset.
-        dawg (DAWG): The DAWG dictionary for cross-check computations.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations.
+        workers (int): Number of processes. With more than one, the file is split
+            into line-aligned byte ranges parsed in a process pool; the DAWG is
+            handed to each worker once (inherited on fork) and rows keep file order.
+        chunks_per_worker (int): Byte ranges per worker, for load balancing.
+        cache_size (int): Boards kept in the position cache (per worker), which
+            shares board-only results between rows with the same board; 0 disables it.
 
     Returns:
         pd.DataFrame: A DataFrame containing processed Scrabble game states.
@@ -107,11 +147,277 @@ def load_scrabble_data(file_path: str, dawg: DAWG) -> pd.DataFrame:
     training_data = []
     start_time = time.time()
 
-    with open(file_path, "r") as file:
-        for line in tqdm(file, desc="Processing Scrabble Data"):
-            training_data.append(parse_scrabble_line(line, dawg))
+    if workers <= 1:
+        cache = PositionCache(cache_size) if cache_size > 0 else None
+        with open(file_path, "r") as file:
+            for line in tqdm(file, desc="Processing Scrabble Data"):
+                training_data.append(parse_scrabble_line(line, dawg, cache))
+        if cache is not None:
+            print(f"Position cache: {cache.stats()}")
+    else:
+        byte_ranges = split_file_into_line_ranges(file_path, workers * chunks_per_worker)
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=_pool_context(), initializer=_init_worker, initargs=(dawg, cache_size)
+        ) as pool:
+            tasks = [(file_path, start, end) for start, end in byte_ranges]
+            for rows in tqdm(pool.map(_parse_byte_range, tasks), total=len(tasks), desc="Processing Scrabble Data"):
+                training_data.extend(rows)
 
     elapsed_time = time.time() - start_time
     print(f"Data loaded in {elapsed_time:.4f} seconds")
 
     return pd.DataFrame(training_data)
+
+
+def iter_scrabble_batches(
+    file_path: str,
+    dawg: Lexicon,
+    batch_size: int = 65536,
+    workers: int = 1,
+    include_boards: bool = False,
+    chunk_bytes: int = 4 << 20,
+    cache_size: int = 4096,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Streams the dataset as fixed-size columnar batches of numeric features.
+
+    Memory stays bounded by the batch size (plus a few chunks in flight when
+    running in parallel), and batches come out in file order as soon as they
+    are ready. Every batch has `batch_size` rows except possibly the last.
+
+    Args:
+        file_path (str): Path to the dataset.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations.
+        batch_size (int): Rows per batch.
+        workers (int): Number of processes (see `load_scrabble_data`).
+        include_boards (bool): Also return a "board" column of shape (N, 15, 15)
+            holding packed square codes (see PackedBoard).
+        chunk_bytes (int): Approximate size of the byte ranges handed to workers.
+        cache_size (int): Position cache size per process (see `load_scrabble_data`).
+
+    Yields:
+        Dict[str, np.ndarray]: Column name -> array, for the columns in
+        NUMERIC_COLUMNS (and "board" if requested).
+    """
+    if workers <= 1:
+        cache = PositionCache(cache_size) if cache_size > 0 else None
+        with open(file_path, "r") as file:
+            lines = []
+            for line in file:
+                lines.append(line)
+                if len(lines) == batch_size:
+                    yield lines_to_batch(lines, dawg, include_boards, cache)
+                    lines = []
+            if lines:
+                yield lines_to_batch(lines, dawg, include_boards, cache)
+        return
+
+    parts = max(workers, os.path.getsize(file_path) // chunk_bytes + 1)
+    byte_ranges = split_file_into_line_ranges(file_path, parts)
+    yield from rebatch(iter_range_batches(file_path, dawg, byte_ranges, workers, include_boards, cache_size), batch_size)
+
+
+def iter_range_batches(
+    file_path: str,
+    dawg: Lexicon,
+    byte_ranges: Iterable[Tuple[int, int]],
+    workers: int = 1,
+    include_boards: bool = False,
+    cache_size: int = 4096,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Parses line-aligned byte ranges of the dataset into one columnar batch per
+    range, yielded in range order (see `iter_scrabble_batches`).
+
+    Args:
+        file_path (str): Path to the dataset.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations.
+        byte_ranges (Iterable[Tuple[int, int]]): (start, end) offsets on line boundaries.
+        workers (int): Number of processes; at most 2 * workers ranges are in flight.
+        include_boards (bool): Also return the packed "board" column.
+        cache_size (int): Position cache size per process (see `load_scrabble_data`).
+
+    Yields:
+        Dict[str, np.ndarray]: One batch per byte range.
+    """
+    if workers <= 1:
+        cache = PositionCache(cache_size) if cache_size > 0 else None
+        for start, end in byte_ranges:
+            yield lines_to_batch(read_lines_in_range(file_path, start, end), dawg, include_boards, cache)
+        return
+
+    tasks = [(file_path, start, end, include_boards) for start, end in byte_ranges]
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=_pool_context(), initializer=_init_worker, initargs=(dawg, cache_size)
+    ) as pool:
+        yield from _ordered_map(pool, _parse_byte_range_to_batch, tasks, 2 * workers)
+
+
+def lines_to_batch(
+    lines: Iterable[str], dawg: Lexicon, include_boards: bool = False, cache: Optional[PositionCache] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Parses dataset lines into one columnar batch (see `iter_scrabble_batches`).
+
+    Same values as `parse_scrabble_line`, but the boards are decoded and the
+    leave/unseen tile counts computed for the whole batch at once (see
+    `parse_run_tile_batch` and `tile_count_matrices`). Cross-checks are
+    computed once per distinct board up to transposition (see `dedupe_boards`)
+    and mapped back to each row's orientation, and the bingo lanes are counted
+    for the whole batch from the stacked cross-check arrays. With a cache,
+    boards already seen in earlier batches also reuse their cross-checks.
+    """
+    fields = [line.split() for line in lines]
+    board_reps = [parts[0] for parts in fields]
+    leave_counts, unseen_counts, possible = tile_count_matrices(board_reps, [parts[1] for parts in fields])
+
+    rows = len(fields)
+    score_diff = np.empty(rows, dtype=NUMERIC_COLUMNS["score_diff"])
+    win_prob = np.empty(rows, dtype=NUMERIC_COLUMNS["winProb"])
+    exp_point_diff = np.empty(rows, dtype=NUMERIC_COLUMNS["expPointDiff"])
+
+    for row, parts in enumerate(fields):
+        opp_score, player_score = map(int, parts[2].split("/"))
+        score_diff[row] = player_score - opp_score
+        _, win_prob[row], exp_point_diff[row] = map(float, parts[3].split(","))
+
+    boards = parse_run_tile_batch(board_reps)
+    unique_boards, board_index, symmetry_index = dedupe_boards(boards, READING_SYMMETRIES)
+    unique_cross_checks = [
+        cached_cross_checks(PackedBoard.from_array(board), dawg, cache) for board in unique_boards
+    ]
+    cross_checks_h, cross_checks_v = [], []
+    for unique, symmetry in zip(board_index, symmetry_index):
+        # The row's board is its canonical board under the inverse symmetry
+        cs_h, cs_v = transform_cross_checks(
+            *unique_cross_checks[unique], inverse_symmetry(READING_SYMMETRIES[symmetry])
+        )
+        cross_checks_h.append(cs_h)
+        cross_checks_v.append(cs_v)
+
+    # Same (board, cs_v, cs_h) argument order as parse_scrabble_line
+    stacked_h = PackedCrossCheckBoard.stack(cross_checks_h)
+    stacked_v = PackedCrossCheckBoard.stack(cross_checks_v)
+    bingos_8 = compute_8_letter_bingo_lanes_batch(boards, stacked_v, stacked_h)
+    bingos_7 = compute_7_letter_bingo_lanes_batch(boards, stacked_v, stacked_h)
+
+    batch = {
+        "score_diff": score_diff,
+        "total_unseen_tiles": unseen_counts.sum(axis=1, dtype=NUMERIC_COLUMNS["total_unseen_tiles"]),
+        **{f"leave_{letter}": leave_counts[:, i] for i, letter in enumerate(TILE_ORDER)},
+        **{f"unseen_{letter}": unseen_counts[:, i] for i, letter in enumerate(TILE_ORDER)},
+        "winProb": win_prob,
+        "expPointDiff": exp_point_diff,
+        "8_letter_bingos": bingos_8.astype(NUMERIC_COLUMNS["8_letter_bingos"], copy=False),
+        "7_letter_bingos": bingos_7.astype(NUMERIC_COLUMNS["7_letter_bingos"], copy=False),
+        "possible": possible,
+    }
+    if include_boards:
+        batch["board"] = boards
+    return batch
+
+
+def _cached(cache: Optional[PositionCache], board_hash: Optional[int], name: str, compute):
+    return compute() if cache is None else cache.get_or_compute(board_hash, name, compute)
+
+
+def rebatch(batches: Iterable[Dict[str, np.ndarray]], batch_size: int) -> Iterator[Dict[str, np.ndarray]]:
+    """Re-slices a stream of columnar batches of any sizes into batches of `batch_size` rows."""
+    pending: List[Dict[str, np.ndarray]] = []
+    pending_rows = 0
+
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += len(next(iter(batch.values())))
+        if pending_rows < batch_size:
+            continue
+
+        merged = _concat_batches(pending)
+        start = 0
+        while pending_rows - start >= batch_size:
+            yield {column: values[start:start + batch_size] for column, values in merged.items()}
+            start += batch_size
+        pending = [{column: values[start:] for column, values in merged.items()}]
+        pending_rows -= start
+
+    if pending_rows:
+        yield _concat_batches(pending)
+
+
+def _concat_batches(batches: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    if len(batches) == 1:
+        return batches[0]
+    return {column: np.concatenate([batch[column] for batch in batches]) for column in batches[0]}
+
+
+def _ordered_map(pool: ProcessPoolExecutor, function, tasks: List, max_in_flight: int) -> Iterator:
+    """Like pool.map, but keeps at most `max_in_flight` tasks submitted so results can't pile up."""
+    futures = []
+    for task in tasks:
+        futures.append(pool.submit(function, task))
+        if len(futures) >= max_in_flight:
+            yield futures.pop(0).result()
+    for future in futures:
+        yield future.result()
+
+
+def split_file_into_line_ranges(file_path: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits a file into up to `parts` byte ranges that start and end on line boundaries.
+
+    Args:
+        file_path (str): Path to the file.
+        parts (int): Desired number of ranges.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(file_path)
+    bounds = [0]
+
+    with open(file_path, "rb") as file:
+        for part in range(1, parts):
+            file.seek(size * part // parts)
+            file.readline()  # Move to the start of the next line
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def read_lines_in_range(file_path: str, start: int, end: int) -> List[str]:
+    """Reads the lines stored between two line-aligned byte offsets."""
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    return data.decode("utf-8").splitlines()
+
+
+# Lexicon and position cache of a pool worker, set once by _init_worker
+_worker_dawg: Optional[Lexicon] = None
+_worker_cache: Optional[PositionCache] = None
+
+
+def _pool_context():
+    # Forked workers inherit the DAWG (and mmap'ed lexicons) without pickling it.
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _init_worker(dawg: Lexicon, cache_size: int = 0) -> None:
+    global _worker_dawg, _worker_cache
+    _worker_dawg = dawg
+    _worker_cache = PositionCache(cache_size) if cache_size > 0 else None
+
+
+def _parse_byte_range(task: Tuple[str, int, int]) -> List[Dict]:
+    file_path, start, end = task
+    return [parse_scrabble_line(line, _worker_dawg, _worker_cache) for line in read_lines_in_range(file_path, start, end)]
+
+
+def _parse_byte_range_to_batch(task: Tuple[str, int, int, bool]) -> Dict[str, np.ndarray]:
+    file_path, start, end, include_boards = task
+    return lines_to_batch(read_lines_in_range(file_path, start, end), _worker_dawg, include_boards, _worker_cache)
@@ -0,0 +1,371 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from features.data_processing import FEATURE_SET_VERSION, NUMERIC_COLUMNS, iter_scrabble_batches, iter_range_batches
+from game_logic.dawg import Lexicon, load_lexicon
+
+MANIFEST_NAME = "manifest.json"
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def feature_cache_key(data_path: str, lexicon_path: str) -> str:
+    """
+    Cache key for the features of a dataset: changes whenever the input file,
+    the lexicon, the feature-set version or the column layout changes.
+
+    Args:
+        data_path (str): Path to the dataset.
+        lexicon_path (str): Path to the serialized DAWG used for cross-checks.
+
+    Returns:
+        str: Hex digest identifying the cached features.
+    """
+    digest = hashlib.sha256()
+    digest.update(file_digest(data_path).encode())
+    digest.update(file_digest(lexicon_path).encode())
+    digest.update(str(FEATURE_SET_VERSION).encode())
+    digest.update(json.dumps({column: dtype.str for column, dtype in NUMERIC_COLUMNS.items()}).encode())
+    return digest.hexdigest()[:32]
+
+
+def count_lines(file_path: str, chunk_size: int = 1 << 20) -> int:
+    """Number of lines in a file (a last line without a newline counts)."""
+    lines = 0
+    last = b"\n"
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    return lines + (last != b"\n")
+
+
+def write_columns(directory: str, batches: Iterable[Dict[str, np.ndarray]], rows: int) -> Dict[str, Dict]:
+    """
+    Streams columnar batches into one .npy file per column.
+
+    Args:
+        directory (str): Output directory (must exist).
+        batches (Iterable[Dict[str, np.ndarray]]): Batches with identical columns.
+        rows (int): Total number of rows the batches add up to.
+
+    Returns:
+        Dict[str, Dict]: Column name -> {"dtype", "shape"} for the manifest.
+    """
+    outputs: Dict[str, np.memmap] = {}
+    written = 0
+
+    for batch in batches:
+        batch_rows = len(next(iter(batch.values())))
+        for column, values in batch.items():
+            if column not in outputs:
+                outputs[column] = np.lib.format.open_memmap(
+                    os.path.join(directory, f"{column}.npy"), mode="w+", dtype=values.dtype, shape=(rows,) + values.shape[1:]
+                )
+            outputs[column][written:written + batch_rows] = values
+        written += batch_rows
+
+    if written != rows:
+        raise ValueError(f"Expected {rows} rows, got {written}")
+
+    columns = {}
+    for column, output in outputs.items():
+        output.flush()
+        columns[column] = {"dtype": output.dtype.str, "shape": list(output.shape)}
+    return columns
+
+
+def read_columns(directory: str, columns: Optional[List[str]] = None, mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Reads .npy columns written by `write_columns`, memory-mapped by default.
+
+    Args:
+        directory (str): Directory holding the column files.
+        columns (Optional[List[str]]): Columns to read; all of them if None.
+        mmap (bool): Memory-map the files read-only instead of loading them.
+
+    Returns:
+        Dict[str, np.ndarray]: Column name -> array.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), "r") as file:
+        available = json.load(file)["columns"]
+
+    selected = list(available) if columns is None else columns
+    missing = [column for column in selected if column not in available]
+    if missing:
+        raise KeyError(f"Columns not in cache: {missing}")
+
+    return {
+        column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode="r" if mmap else None)
+        for column in selected
+    }
+
+
+def load_cached_feature_arrays(
+    data_path: str,
+    lexicon_path: str,
+    cache_dir: str = "../data/feature_cache",
+    columns: Optional[List[str]] = None,
+    workers: int = 1,
+) -> Dict[str, np.ndarray]:
+    """
+    Returns the numeric features of a dataset (plus "board", the (N, 15, 15)
+    packed boards), computing and caching them on first use.
+
+    Cached features are stored as memory-mappable .npy files under a key
+    derived from the input file, the lexicon and FEATURE_SET_VERSION, so a
+    hit involves no parsing and stale caches are never reused.
+
+    Args:
+        data_path (str): Path to the dataset.
+        lexicon_path (str): Path to the serialized DAWG (loaded only on a miss).
+        cache_dir (str): Directory holding one subdirectory per cache key.
+        columns (Optional[List[str]]): Columns to return; all of them if None.
+        workers (int): Processes used when the cache has to be built.
+
+    Returns:
+        Dict[str, np.ndarray]: Column name -> read-only memory-mapped array.
+    """
+    directory = os.path.join(cache_dir, feature_cache_key(data_path, lexicon_path))
+
+    if not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+        build_feature_cache(data_path, lexicon_path, directory, workers)
+
+    return read_columns(directory, columns)
+
+
+def load_cached_features(
+    data_path: str,
+    lexicon_path: str,
+    cache_dir: str = "../data/feature_cache",
+    columns: Optional[List[str]] = None,
+    workers: int = 1,
+) -> pd.DataFrame:
+    """
+    DataFrame of the cached numeric features (see `load_cached_feature_arrays`).
+    The 3D "board" column is left out unless explicitly requested.
+    """
+    if columns is None:
+        columns = list(NUMERIC_COLUMNS)
+    if "board" in columns:
+        raise ValueError('The "board" column is 3D; use load_cached_feature_arrays for it')
+    return pd.DataFrame(load_cached_feature_arrays(data_path, lexicon_path, cache_dir, columns, workers), copy=False)
+
+
+def build_feature_cache(data_path: str, lexicon_path: str, directory: str, workers: int = 1) -> None:
+    """Computes the features of a dataset and writes them to `directory` atomically."""
+    start_time = time.time()
+    dawg = load_lexicon(lexicon_path)
+    rows = count_lines(data_path)
+
+    os.makedirs(os.path.dirname(directory) or ".", exist_ok=True)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    try:
+        batches = iter_scrabble_batches(data_path, dawg, workers=workers, include_boards=True)
+        columns = write_columns(staging, tqdm(batches, desc="Caching Scrabble Features"), rows)
+
+        manifest = {
+            "feature_set_version": FEATURE_SET_VERSION,
+            "data_path": os.path.abspath(data_path),
+            "lexicon_path": os.path.abspath(lexicon_path),
+            "rows": rows,
+            "columns": columns,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(os.path.join(staging, MANIFEST_NAME), "w") as file:
+            json.dump(manifest, file, indent=2)
+
+        os.rename(staging, directory)
+    except OSError:
+        if not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+            raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)  # Another process may have won the race
+
+    print(f"Feature cache built in {time.time() - start_time:.4f} seconds: {directory}")
+
+
+def process_scrabble_data_sharded(
+    file_path: str,
+    dawg: Lexicon,
+    output_dir: str,
+    shard_lines: int = 65536,
+    workers: int = 1,
+    include_boards: bool = False,
+) -> Dict:
+    """
+    Processes a dataset into shards of columnar features, resuming where a
+    previous run stopped.
+
+    Each shard covers `shard_lines` complete lines and is committed (written,
+    renamed into place, recorded in the manifest with its byte range and
+    checksum) before the next one starts, so a crash loses at most the shard
+    in progress. On restart, finished shards are verified and skipped; if lines
+    were appended to the input since, only the new tail is processed. A
+    trailing line without a newline is left for a later run.
+
+    Args:
+        file_path (str): Path to the dataset.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations.
+        output_dir (str): Directory holding the shards and manifest.
+        shard_lines (int): Lines per shard.
+        workers (int): Processes used to parse shards (committed in order).
+        include_boards (bool): Also store the packed "board" column.
+
+    Returns:
+        Dict: The manifest (shards, processed byte offset, total rows).
+
+    Raises:
+        ValueError: If the already processed part of the input changed, or the
+            output was produced by a different feature-set version.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_shard_manifest(file_path, output_dir, include_boards)
+
+    start_time = time.time()
+    shard_ranges = _shard_ranges(file_path, manifest["processed_bytes"], shard_lines)
+    batches = iter_range_batches(
+        file_path, dawg, [(start, end) for start, end, _ in shard_ranges], workers, include_boards
+    )
+
+    for (start, end, rows), batch in tqdm(zip(shard_ranges, batches), total=len(shard_ranges), desc="Processing Shards"):
+        name = f"shard-{len(manifest['shards']):05d}"
+        staging = os.path.join(output_dir, f"{name}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        columns = write_columns(staging, [batch], rows)
+        with open(os.path.join(staging, MANIFEST_NAME), "w") as file:
+            json.dump({"rows": rows, "columns": columns}, file)
+
+        shutil.rmtree(os.path.join(output_dir, name), ignore_errors=True)  # Left over from a crash
+        os.rename(staging, os.path.join(output_dir, name))
+
+        manifest["shards"].append({
+            "name": name, "start": start, "end": end, "rows": rows, "sha256": _range_digest(file_path, start, end),
+        })
+        manifest["processed_bytes"] = end
+        manifest["rows"] += rows
+        _write_json_atomic(os.path.join(output_dir, MANIFEST_NAME), manifest)
+
+    print(f"Processed {len(shard_ranges)} new shard(s) in {time.time() - start_time:.4f} seconds; "
+          f"{manifest['rows']} rows in {len(manifest['shards'])} shard(s)")
+    return manifest
+
+
+def load_sharded_features(output_dir: str, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Concatenates the columns of all committed shards (see `process_scrabble_data_sharded`).
+
+    Args:
+        output_dir (str): Directory holding the shards and manifest.
+        columns (Optional[List[str]]): Columns to read; all of them if None.
+
+    Returns:
+        Dict[str, np.ndarray]: Column name -> array over all shards, in file order.
+    """
+    with open(os.path.join(output_dir, MANIFEST_NAME), "r") as file:
+        manifest = json.load(file)
+
+    shards = [read_columns(os.path.join(output_dir, shard["name"]), columns) for shard in manifest["shards"]]
+    if not shards:
+        return {}
+    return {column: np.concatenate([shard[column] for shard in shards]) for column in shards[0]}
+
+
+def _load_shard_manifest(file_path: str, output_dir: str, include_boards: bool) -> Dict:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {
+            "feature_set_version": FEATURE_SET_VERSION,
+            "data_path": os.path.abspath(file_path),
+            "include_boards": include_boards,
+            "processed_bytes": 0,
+            "rows": 0,
+            "shards": [],
+        }
+
+    with open(path, "r") as file:
+        manifest = json.load(file)
+
+    if manifest["feature_set_version"] != FEATURE_SET_VERSION or manifest["include_boards"] != include_boards:
+        raise ValueError(f"{output_dir} holds shards of a different feature set; use a new output directory")
+
+    if os.path.getsize(file_path) < manifest["processed_bytes"]:
+        raise ValueError(f"{file_path} is shorter than the {manifest['processed_bytes']} bytes already processed")
+
+    for shard in manifest["shards"]:
+        if _range_digest(file_path, shard["start"], shard["end"]) != shard["sha256"]:
+            raise ValueError(
+                f"{file_path} changed within bytes {shard['start']}-{shard['end']} ({shard['name']}); "
+                "only appending is supported, use a new output directory"
+            )
+
+    return manifest
+
+
+def _shard_ranges(file_path: str, start: int, shard_lines: int, chunk_size: int = 1 << 20) -> List[Tuple[int, int, int]]:
+    """(start, end, rows) of consecutive shards of complete lines from byte `start` on."""
+    ranges = []
+    shard_start = line_end = position = start
+    rows = 0
+
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            newline = chunk.find(b"\n")
+            while newline != -1:
+                rows += 1
+                line_end = position + newline + 1
+                if rows == shard_lines:
+                    ranges.append((shard_start, line_end, rows))
+                    shard_start, rows = line_end, 0
+                newline = chunk.find(b"\n", newline + 1)
+            position += len(chunk)
+
+    if rows:
+        # Anything after the last newline is an incomplete line and is left for a later run
+        ranges.append((shard_start, line_end, rows))
+
+    return ranges
+
+
+def _range_digest(file_path: str, start: int, end: int, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        file.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(path: str, data: Dict) -> None:
+    staging = f"{path}.tmp"
+    with open(staging, "w") as file:
+        json.dump(data, file, indent=2)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(staging, path)
@@ -0,0 +1,125 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+from game_logic.crosschecks import find_cross_checks_both
+from game_logic.dawg import Lexicon
+from game_logic.symmetry import transform_board, transform_cross_checks
+from game_logic.types import Board, PackedBoard, PackedCrossCheckBoard
+from game_logic.zobrist import zobrist_hash_pair
+
+
+class PositionCache:
+    """
+    Bounded LRU cache of board-only results (cross-checks, lanes, special
+    squares...), keyed by the board's Zobrist hash (see game_logic.zobrist).
+
+    Rows that share a board but differ in rack, scores or labels then share
+    those results. Each board holds a dict of named values filled in on demand;
+    the least recently used board is evicted once `maxsize` boards are stored.
+    Cached values are shared between rows and must not be mutated.
+
+    Thread-safe; counters are exposed through `stats()` to help size the cache.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        if maxsize <= 0:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, board_hash: int, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the value `name` of a board, computing and storing it on a miss.
+
+        Args:
+            board_hash (int): Zobrist hash of the board.
+            name (str): Which board-only value (e.g. "cross_checks").
+            compute (Callable[[], Any]): Computes the value; called without the lock held.
+
+        Returns:
+            Any: The cached or freshly computed value.
+        """
+        with self._lock:
+            entry = self._entries.get(board_hash)
+            if entry is not None:
+                self._entries.move_to_end(board_hash)
+                if name in entry:
+                    self.hits += 1
+                    return entry[name]
+            self.misses += 1
+
+        value = compute()
+
+        with self._lock:
+            entry = self._entries.get(board_hash)
+            if entry is None:
+                entry = self._entries[board_hash] = {}
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+            return entry.setdefault(name, value)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters, current size and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drops all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def cached_cross_checks(
+    board: Union[Board, PackedBoard],
+    dawg: Lexicon,
+    cache: Optional[PositionCache],
+    board_hashes: Optional[Tuple[int, int]] = None,
+) -> Tuple[PackedCrossCheckBoard, PackedCrossCheckBoard]:
+    """
+    Packed (cs_h, cs_v) of a board, shared through the cache with every
+    position on the same board or on its transpose.
+
+    The cache stores the cross-checks of whichever of the two orientations has
+    the smaller Zobrist hash (see game_logic.symmetry); the other orientation
+    gets them transposed, with cs_h and cs_v swapped. Other symmetries reverse
+    words and so cannot share cross-checks.
+
+    Args:
+        board (Union[Board, PackedBoard]): The board.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations.
+        cache (Optional[PositionCache]): The cache; None computes directly.
+        board_hashes (Optional[Tuple[int, int]]): `zobrist_hash_pair(board)`, if
+            the caller already has it; otherwise computed here.
+
+    Returns:
+        Tuple[PackedCrossCheckBoard, PackedCrossCheckBoard]: (cs_h, cs_v).
+    """
+    if cache is None:
+        return find_cross_checks_both(board, dawg, packed=True)
+
+    board_hash, transposed_hash = board_hashes if board_hashes is not None else zobrist_hash_pair(board)
+    if transposed_hash < board_hash:
+        cs_h, cs_v = cache.get_or_compute(
+            transposed_hash, "cross_checks",
+            lambda: find_cross_checks_both(transform_board(board, "transpose"), dawg, packed=True),
+        )
+        return transform_cross_checks(cs_h, cs_v, "transpose")
+    return cache.get_or_compute(board_hash, "cross_checks", lambda: find_cross_checks_both(board, dawg, packed=True))
@@ -0,0 +1,435 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from features.board_features import extract_board_features
+from features.board_parsing import parse_run_tile_representation
+from features.position_cache import PositionCache, cached_cross_checks
+from features.quadrant_features import count_tiles_in_quadrants
+from features.special_squares import (
+    CONNECTION_TYPES, compute_accessible_special_tiles_batch, compute_accessible_special_connections_batch,
+)
+from game_logic.dawg import Lexicon
+from game_logic.types import PackedCrossCheckBoard
+from game_logic.utils import TILE_ORDER, TILE_DIST
+from game_logic.zobrist import zobrist_hash_pair
+
+
+class LexiconRequired(RuntimeError):
+    """Raised when a feature needs cross-checks but the Position has no lexicon."""
+
+
+class Intermediate:
+    """A value shared by several features (the parsed board, its cross-checks...)."""
+    __slots__ = ("name", "requires", "compute", "board_only")
+
+    def __init__(self, name: str, requires: Sequence[str], compute: Callable[..., Any], board_only: bool = False):
+        self.name = name
+        self.requires = list(requires)
+        self.compute = compute
+        self.board_only = board_only
+
+
+class Feature:
+    """
+    A group of output columns computed together from some intermediates,
+    optionally with a vectorized version for whole batches (`compute_batch`).
+    """
+    __slots__ = ("name", "columns", "requires", "compute", "dtypes", "board_only", "compute_batch", "batch_requires")
+
+    def __init__(
+        self,
+        name: str,
+        columns: Dict[str, np.dtype],
+        requires: Sequence[str],
+        compute: Callable[..., Dict[str, Any]],
+        board_only: bool = False,
+    ):
+        self.name = name
+        self.columns = list(columns)
+        self.dtypes = dict(columns)
+        self.requires = list(requires)
+        self.compute = compute
+        self.board_only = board_only
+        self.compute_batch: Optional[Callable[..., Dict[str, np.ndarray]]] = None
+        self.batch_requires: List[str] = []
+
+
+INTERMEDIATES: Dict[str, Intermediate] = {}
+FEATURES: Dict[str, Feature] = {}
+COLUMN_TO_FEATURE: Dict[str, str] = {}
+
+
+def register_intermediate(name: str, requires: Sequence[str] = (), board_only: bool = False) -> Callable:
+    """
+    Registers a function computing an intermediate from the intermediates it requires.
+
+    The function receives the required values as positional arguments, in the
+    order given; "dawg" and "cache" are always available. `board_only` values depend on
+    nothing but the board (and lexicon) and are shared through a PositionCache.
+    """
+    def decorator(function: Callable[..., Any]) -> Callable[..., Any]:
+        if name in INTERMEDIATES:
+            raise ValueError(f"Intermediate {name!r} is already registered")
+        INTERMEDIATES[name] = Intermediate(name, requires, function, board_only)
+        return function
+    return decorator
+
+
+def register_feature(
+    name: str, columns: Dict[str, np.dtype], requires: Sequence[str] = (), board_only: bool = False
+) -> Callable:
+    """
+    Registers a function computing a group of columns (column -> value dict)
+    from the intermediates it requires.
+
+    Args:
+        name (str): Feature group name.
+        columns (Dict[str, np.dtype]): The columns it produces, with their batch dtypes.
+        requires (Sequence[str]): Intermediates passed to the function, in order.
+        board_only (bool): The columns depend only on the board (cacheable per board).
+    """
+    def decorator(function: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        if name in FEATURES:
+            raise ValueError(f"Feature {name!r} is already registered")
+        clashes = [column for column in columns if column in COLUMN_TO_FEATURE]
+        if clashes:
+            raise ValueError(f"Columns {clashes} are already produced by other features")
+        FEATURES[name] = Feature(name, columns, requires, function, board_only)
+        COLUMN_TO_FEATURE.update((column, name) for column in columns)
+        return function
+    return decorator
+
+
+def register_feature_batch(name: str, requires: Sequence[str]) -> Callable:
+    """
+    Registers a vectorized version of feature `name`, used by `extract_feature_batch`.
+
+    The function receives one list per intermediate in `requires` (its values
+    for every position of the batch, in order) and returns column -> (N,) array.
+    It must give the same values as the per-position function.
+    """
+    def decorator(function: Callable[..., Dict[str, np.ndarray]]) -> Callable[..., Dict[str, np.ndarray]]:
+        feature = FEATURES.get(name)
+        if feature is None:
+            raise ValueError(f"Feature {name!r} is not registered")
+        if feature.compute_batch is not None:
+            raise ValueError(f"Feature {name!r} already has a batch version")
+        feature.compute_batch = function
+        feature.batch_requires = list(requires)
+        return function
+    return decorator
+
+
+class Position:
+    """
+    Lazily evaluated intermediates of one position.
+
+    Start from a dataset line (`Position(dawg, line=...)`) or from any known
+    intermediates (e.g. `board_rep`, `rack` and `scores` on the server); anything
+    else a feature needs is computed on first use and shared by all features.
+    With a cache, board-only intermediates and features are also shared with
+    every other position on the same board.
+    """
+
+    def __init__(self, dawg: Optional[Lexicon] = None, cache: Optional[PositionCache] = None, **known: Any):
+        self.cache = cache
+        self.values: Dict[str, Any] = {"dawg": dawg, "cache": cache, **known}
+
+    def get(self, name: str) -> Any:
+        if name not in self.values:
+            intermediate = INTERMEDIATES.get(name)
+            if intermediate is None:
+                raise KeyError(f"{name!r} is neither known for this position nor a registered intermediate")
+            self.values[name] = self.board_cached(
+                name, intermediate.board_only,
+                lambda: intermediate.compute(*(self.get(required) for required in intermediate.requires)),
+            )
+        return self.values[name]
+
+    def board_cached(self, name: str, board_only: bool, compute: Callable[[], Any]) -> Any:
+        """`compute()`, looked up in / stored to the cache if the value only depends on the board."""
+        if self.cache is None or not board_only:
+            return compute()
+        return self.cache.get_or_compute(self.get("board_hash"), name, compute)
+
+
+def features_for_columns(columns: Iterable[str]) -> List[Feature]:
+    """The feature groups producing `columns`, each once, in registration order."""
+    columns = list(columns)
+    unknown = [column for column in columns if column not in COLUMN_TO_FEATURE]
+    if unknown:
+        raise KeyError(f"No registered feature produces columns {unknown}")
+    needed = {COLUMN_TO_FEATURE[column] for column in columns}
+    return [feature for name, feature in FEATURES.items() if name in needed]
+
+
+def required_intermediates(columns: Iterable[str]) -> Set[str]:
+    """
+    Every intermediate that computing `columns` position by position may use,
+    e.g. to check that "dawg" is available before serving them.
+    """
+    required: Set[str] = set()
+    pending = [name for feature in features_for_columns(columns) for name in feature.requires]
+    while pending:
+        name = pending.pop()
+        if name not in required:
+            required.add(name)
+            intermediate = INTERMEDIATES.get(name)
+            if intermediate is not None:
+                pending.extend(intermediate.requires)
+    return required
+
+
+def extract_features(position: Position, columns: Sequence[str]) -> Dict[str, Any]:
+    """
+    Computes exactly the feature groups needed for `columns` on one position.
+
+    Args:
+        position (Position): The position (see `Position`).
+        columns (Sequence[str]): Columns to return, in this order.
+
+    Returns:
+        Dict[str, Any]: Column -> value.
+    """
+    values: Dict[str, Any] = {}
+    for feature in features_for_columns(columns):
+        values.update(position.board_cached(
+            f"feature:{feature.name}", feature.board_only,
+            lambda: feature.compute(*(position.get(required) for required in feature.requires)),
+        ))
+    return {column: values[column] for column in columns}
+
+
+def extract_feature_batch(
+    lines: Iterable[str], dawg: Lexicon, columns: Sequence[str], cache: Optional[PositionCache] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Computes `columns` for dataset lines as a columnar batch (see `iter_scrabble_batches`).
+
+    Features with a batch version (see `register_feature_batch`) are computed
+    once for all lines from their intermediates; the others line by line.
+
+    Args:
+        lines (Iterable[str]): Dataset lines.
+        dawg (Lexicon): The DAWG dictionary for cross-check computations (only
+            used if a requested column needs cross-checks).
+        columns (Sequence[str]): Columns to compute.
+        cache (Optional[PositionCache]): Shares board-only results between lines.
+
+    Returns:
+        Dict[str, np.ndarray]: Column -> array, with each feature's declared dtypes.
+    """
+    positions = [Position(dawg, cache, line=line) for line in lines]
+    dtypes = {column: FEATURES[COLUMN_TO_FEATURE[column]].dtypes[column] for column in columns}
+
+    batch: Dict[str, np.ndarray] = {}
+    for feature in features_for_columns(columns):
+        if feature.compute_batch is not None and positions:
+            values = feature.compute_batch(*(
+                [position.get(required) for position in positions] for required in feature.batch_requires
+            ))
+            batch.update((column, values[column]) for column in feature.columns if column in dtypes)
+
+    row_columns = [column for column in columns if column not in batch]
+    rows = [extract_features(position, row_columns) for position in positions]
+    for column in row_columns:
+        batch[column] = np.fromiter((row[column] for row in rows), dtype=dtypes[column], count=len(rows))
+    return {column: np.asarray(batch[column], dtype=dtypes[column]) for column in columns}
+
+
+# ---------------------------------------------------------------------------
+# Intermediates
+# ---------------------------------------------------------------------------
+
+@register_intermediate("fields", ["line"])
+def _fields(line: str) -> List[str]:
+    return line.strip().split()
+
+
+@register_intermediate("board_rep", ["fields"])
+def _board_rep(fields: List[str]) -> str:
+    return fields[0]
+
+
+@register_intermediate("rack", ["fields"])
+def _rack(fields: List[str]) -> str:
+    return fields[1]
+
+
+@register_intermediate("scores", ["fields"])
+def _scores(fields: List[str]) -> List[int]:
+    """(opponent score, player score)"""
+    return list(map(int, fields[2].split("/")))
+
+
+@register_intermediate("evaluation", ["fields"])
+def _evaluation(fields: List[str]) -> List[float]:
+    """(equity, win probability, expected point differential)"""
+    return list(map(float, fields[3].split(",")))
+
+
+@register_intermediate("board", ["board_rep"])
+def _board(board_rep: str):
+    return parse_run_tile_representation(board_rep)
+
+
+@register_intermediate("board_hashes", ["board"])
+def _board_hashes(board) -> Tuple[int, int]:
+    """Zobrist hashes of the board and of its transpose"""
+    return zobrist_hash_pair(board)
+
+
+@register_intermediate("board_hash", ["board_hashes"])
+def _board_hash(board_hashes: Tuple[int, int]) -> int:
+    return board_hashes[0]
+
+
+@register_intermediate("cross_checks", ["board", "dawg", "cache", "board_hashes"])
+def _cross_checks(board, dawg: Lexicon, cache: Optional[PositionCache], board_hashes: Tuple[int, int]):
+    """(cs_h, cs_v), packed; cached per board up to transposition"""
+    if dawg is None:
+        raise LexiconRequired("Cross-check features need a lexicon")
+    return cached_cross_checks(board, dawg, cache, board_hashes)
+
+
+@register_intermediate("board_features", ["board", "cross_checks"], board_only=True)
+def _board_features(board, cross_checks) -> Dict[str, Any]:
+    """Bingo lanes and special squares from one scan of the rows and columns"""
+    cs_h, cs_v = cross_checks
+    # Same argument orders as parse_scrabble_line: (board, cs_v, cs_h) for the bingo
+    # lanes, (board, cs_h, cs_v) for the special squares
+    return extract_board_features(board, cs_h, cs_v, lane_cross_checks=(cs_v, cs_h))
+
+
+@register_intermediate("leave_counts", ["rack"])
+def _leave_counts(rack: str) -> Dict[str, int]:
+    tile_counts = {tile: 0 for tile in TILE_ORDER}
+    for tile in rack.replace("/", ""):
+        if tile in tile_counts:
+            tile_counts[tile] += 1
+    return tile_counts
+
+
+@register_intermediate("unseen_counts", ["board_rep", "rack"])
+def _unseen_counts(board_rep: str, rack: str) -> Dict[str, int]:
+    unseen_tiles = dict(TILE_DIST)
+    for el in board_rep:
+        if not el.isalpha():
+            continue
+        if el.islower():
+            unseen_tiles["?"] -= 1
+        else:
+            unseen_tiles[el] -= 1
+
+    for el in rack.replace("/", ""):
+        unseen_tiles[el] -= 1
+    return unseen_tiles
+
+
+# ---------------------------------------------------------------------------
+# Features (same values and column names as parse_scrabble_line and the notebooks)
+# ---------------------------------------------------------------------------
+
+@register_feature("score_diff", {"score_diff": np.dtype(np.int32)}, ["scores"])
+def _score_diff(scores: List[int]) -> Dict[str, int]:
+    opp_score, player_score = scores
+    return {"score_diff": player_score - opp_score}
+
+
+@register_feature(
+    "evaluation", {"winProb": np.dtype(np.float64), "expPointDiff": np.dtype(np.float64)}, ["evaluation"]
+)
+def _evaluation_columns(evaluation: List[float]) -> Dict[str, float]:
+    _, win_prob, exp_diff = evaluation
+    return {"winProb": win_prob, "expPointDiff": exp_diff}
+
+
+@register_feature("leave", {f"leave_{letter}": np.dtype(np.int8) for letter in TILE_ORDER}, ["leave_counts"])
+def _leave(leave_counts: Dict[str, int]) -> Dict[str, int]:
+    return {f"leave_{letter}": leave_counts[letter] for letter in TILE_ORDER}
+
+
+@register_feature(
+    "unseen",
+    {
+        "total_unseen_tiles": np.dtype(np.int16),
+        **{f"unseen_{letter}": np.dtype(np.int8) for letter in TILE_ORDER},
+        "possible": np.dtype(np.bool_),
+    },
+    ["unseen_counts"],
+)
+def _unseen(unseen_counts: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "total_unseen_tiles": sum(unseen_counts.values()),
+        **{f"unseen_{letter}": unseen_counts[letter] for letter in TILE_ORDER},
+        "possible": all(count >= 0 for count in unseen_counts.values()),
+    }
+
+
+@register_feature(
+    "bingo_lanes",
+    {"8_letter_bingos": np.dtype(np.int32), "7_letter_bingos": np.dtype(np.int32)},
+    ["board_features"],
+    board_only=True,
+)
+def _bingo_lanes(board_features: Dict[str, Any]) -> Dict[str, int]:
+    return {
+        "8_letter_bingos": board_features["8_letter_bingos"],
+        "7_letter_bingos": board_features["7_letter_bingos"],
+    }
+
+
+@register_feature(
+    "quadrants",
+    {f"quadrant_counts_{quadrant}": np.dtype(np.int16)
+     for quadrant in ("upper_left", "upper_right", "lower_left", "lower_right")},
+    ["board"],
+    board_only=True,
+)
+def _quadrants(board) -> Dict[str, int]:
+    return {f"quadrant_counts_{quadrant}": count for quadrant, count in count_tiles_in_quadrants(board).items()}
+
+
+@register_feature(
+    "special_squares",
+    {"accessible_TWS_count": np.dtype(np.int16), "accessible_DWS_count": np.dtype(np.int16)},
+    ["board_features"],
+    board_only=True,
+)
+def _special_squares(board_features: Dict[str, Any]) -> Dict[str, int]:
+    tws_count, dws_count = board_features["accessible_special_tiles"]
+    return {"accessible_TWS_count": tws_count, "accessible_DWS_count": dws_count}
+
+
+@register_feature(
+    "special_connections",
+    {f"available_{special_type.replace('/', '_')}": np.dtype(np.int16) for special_type in CONNECTION_TYPES},
+    ["board_features"],
+    board_only=True,
+)
+def _special_connections(board_features: Dict[str, Any]) -> Dict[str, int]:
+    connections = board_features["accessible_special_connections"]
+    return {f"available_{special_type.replace('/', '_')}": count for special_type, count in connections.items()}
+
+
+@register_feature_batch("special_squares", ["board", "cross_checks"])
+def _special_squares_batch(boards: List, cross_checks: List) -> Dict[str, np.ndarray]:
+    counts = compute_accessible_special_tiles_batch(*_stacked_boards(boards, cross_checks))
+    return {"accessible_TWS_count": counts[:, 0], "accessible_DWS_count": counts[:, 1]}
+
+
+@register_feature_batch("special_connections", ["board", "cross_checks"])
+def _special_connections_batch(boards: List, cross_checks: List) -> Dict[str, np.ndarray]:
+    connections = compute_accessible_special_connections_batch(*_stacked_boards(boards, cross_checks))
+    return {f"available_{special_type.replace('/', '_')}": counts for special_type, counts in connections.items()}
+
+
+def _stacked_boards(boards: List, cross_checks: List):
+    """(N, 15, 15) occupancy and the stacked (cs_h, cs_v) of a batch, for the batch kernels."""
+    occupied = np.array([[[tile is not None for tile in row] for row in board] for board in boards], dtype=bool)
+    return (
+        occupied,
+        PackedCrossCheckBoard.stack([cs_h for cs_h, _ in cross_checks]),
+        PackedCrossCheckBoard.stack([cs_v for _, cs_v in cross_checks]),
+    )
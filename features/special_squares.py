@@ -1,5 +1,8 @@
-from typing import List, Tuple
-from game_logic.types import Board, CrossCheckBoard
+from typing import List, Tuple, Dict
+
+import numpy as np
+
+from game_logic.types import Board, AnyCrossCheckBoard, PackedCrossCheckBoard, CROSS_CHECK_PRESENT, cross_check_grids
 from game_logic.utils import SPECIAL_TILES_LOCATIONS
 
 
@@ -31,7 +34,7 @@ SPECIAL_TILES_CONNECTIONS = {
 
 
 def is_accessible_special_tile(
-    row: int, col: int, board: Board, crosscheck_board_h: CrossCheckBoard, crosscheck_board_v: CrossCheckBoard
+    row: int, col: int, board: Board, crosscheck_board_h: AnyCrossCheckBoard, crosscheck_board_v: AnyCrossCheckBoard
 ) -> bool:
     """
     Determines if a TWS or DWS tile is accessible to an opponent.
@@ -40,15 +43,24 @@ def is_accessible_special_tile(
         row (int): Row index of the special square.
         col (int): Column index of the special square.
         board (Board): 15x15 Scrabble board.
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
 
     Returns:
         bool: True if the special square is accessible, False otherwise.
     """
+    return _is_accessible_special_tile(
+        row, col, board, *cross_check_grids(crosscheck_board_h), *cross_check_grids(crosscheck_board_v)
+    )
+
+
+def _is_accessible_special_tile(
+    row: int, col: int, board: Board,
+    masks_h: List[List[int]], flags_h: List[List[int]], masks_v: List[List[int]], flags_v: List[List[int]]
+) -> bool:
+    """`is_accessible_special_tile` over cross-check mask/flag grids."""
     # 1️⃣ If a cross-check exists here and has a non-zero valid_letter set → Immediately accessible!
-    if ((crosscheck_board_h[row][col] and crosscheck_board_h[row][col].valid_letters) or 
-        (crosscheck_board_v[row][col] and crosscheck_board_v[row][col].valid_letters)):
+    if masks_h[row][col] or masks_v[row][col]:
         return True  
 
     # 2️⃣ Check if the special tile is unoccupied
@@ -91,17 +103,17 @@ def is_accessible_special_tile(
 
     # 4️⃣ Look up to 7 spaces away for isolated tiles or cross-check access
     if (
-        can_reach_within_7(row, col, 0, -1, board, crosscheck_board_h) or  # Left
-        can_reach_within_7(row, col, 0, 1, board, crosscheck_board_h) or   # Right
-        can_reach_within_7(row, col, -1, 0, board, crosscheck_board_v) or  # Up
-        can_reach_within_7(row, col, 1, 0, board, crosscheck_board_v)      # Down
+        _can_reach_within_7(row, col, 0, -1, board, masks_h, flags_h) or  # Left
+        _can_reach_within_7(row, col, 0, 1, board, masks_h, flags_h) or   # Right
+        _can_reach_within_7(row, col, -1, 0, board, masks_v, flags_v) or  # Up
+        _can_reach_within_7(row, col, 1, 0, board, masks_v, flags_v)      # Down
     ):
         return True
 
     return False  # No valid access route
 
 
-def can_reach_within_7(r: int, c: int, dr: int, dc: int, board: Board, crosscheck_board: CrossCheckBoard) -> bool:
+def can_reach_within_7(r: int, c: int, dr: int, dc: int, board: Board, crosscheck_board: AnyCrossCheckBoard) -> bool:
     """
     Determines if the special square can be reached within 7 spaces.
 
@@ -115,11 +127,18 @@ def can_reach_within_7(r: int, c: int, dr: int, dc: int, board: Board, crosschec
         dr (int): Row direction (-1 for up, 1 for down, 0 for horizontal).
         dc (int): Column direction (-1 for left, 1 for right, 0 for vertical).
         board (Board): 15x15 Scrabble board.
-        crosscheck_board (CrossCheckBoard): Cross-check constraints.
+        crosscheck_board (AnyCrossCheckBoard): Cross-check constraints (packed or not).
 
     Returns:
         bool: True if accessible within 7 spaces, False otherwise.
     """
+    return _can_reach_within_7(r, c, dr, dc, board, *cross_check_grids(crosscheck_board))
+
+
+def _can_reach_within_7(
+    r: int, c: int, dr: int, dc: int, board: Board, masks: List[List[int]], flags: List[List[int]]
+) -> bool:
+    """`can_reach_within_7` over cross-check mask/flag grids."""
     for i in range(1, 8):  # Max 7 spaces
         r_next, c_next = r + i * dr, c + i * dc
 
@@ -136,14 +155,13 @@ def can_reach_within_7(r: int, c: int, dr: int, dc: int, board: Board, crosschec
             return True  # Otherwise, it's accessible
 
         # Case 2️⃣: If we hit a cross-check, check if the next two spaces are not both occupied
-        crosscheck = crosscheck_board[r_next][c_next]
-        if crosscheck and crosscheck.is_open_square:
-            crosscheck = None
+        # (open squares don't count as cross-checks)
+        constrained = flags[r_next][c_next] == CROSS_CHECK_PRESENT
 
-        if(crosscheck and len(crosscheck.valid_letters) == 0):
+        if(constrained and masks[r_next][c_next] == 0):
             return False
             
-        if crosscheck and len(crosscheck.valid_letters) > 0:
+        if constrained and masks[r_next][c_next] != 0:
             r_next_next, c_next_next = r_next + dr, c_next + dc
             r_next_next2, c_next_next2 = r_next_next + dr, c_next_next + dc
 
@@ -156,26 +174,27 @@ def can_reach_within_7(r: int, c: int, dr: int, dc: int, board: Board, crosschec
     return False  # No valid access found
 
 
-def compute_accessible_special_tiles(board: Board, crosscheck_board_h: CrossCheckBoard, crosscheck_board_v: CrossCheckBoard) -> Tuple[int, int]:
+def compute_accessible_special_tiles(board: Board, crosscheck_board_h: AnyCrossCheckBoard, crosscheck_board_v: AnyCrossCheckBoard) -> Tuple[int, int]:
     """
     Computes the number of accessible TWS and DWS tiles on the board.
 
     Args:
         board (Board): 15x15 Scrabble board.
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
 
     Returns:
         (int, int): Tuple containing (accessible TWS count, accessible DWS count)
     """
     tws_count = 0
     dws_count = 0
+    grids = (*cross_check_grids(crosscheck_board_h), *cross_check_grids(crosscheck_board_v))
 
     for row in range(15):
         for col in range(15):
             tile_type = SPECIAL_TILES_LOCATIONS[row][col]
             if tile_type in {"TWS", "DWS"}:
-                if is_accessible_special_tile(row, col, board, crosscheck_board_h, crosscheck_board_v):
+                if _is_accessible_special_tile(row, col, board, *grids):
                     if tile_type == "TWS":
                         tws_count += 1
                     elif tile_type == "DWS":
@@ -184,12 +203,45 @@ def compute_accessible_special_tiles(board: Board, crosscheck_board_h: CrossChec
     return tws_count, dws_count
 
 
+def compute_accessible_special_tiles_batch(
+    occupied: np.ndarray, crosscheck_boards_h: PackedCrossCheckBoard, crosscheck_boards_v: PackedCrossCheckBoard
+) -> np.ndarray:
+    """
+    Batch version of `compute_accessible_special_tiles` for N boards at once.
+
+    Args:
+        occupied (np.ndarray): (N, 15, 15) occupancy, boolean or packed square codes.
+        crosscheck_boards_h (PackedCrossCheckBoard): Stacked horizontal cross-checks (arrays of shape (N, 15, 15)).
+        crosscheck_boards_v (PackedCrossCheckBoard): Stacked vertical cross-checks.
+
+    Returns:
+        np.ndarray: (N, 2) int32 array of (accessible TWS count, accessible DWS count).
+    """
+    occupied, masks_h, flags_h, masks_v, flags_v = _flat_batch(occupied, crosscheck_boards_h, crosscheck_boards_v)
+    squares = _ACCESS_ARRAYS["index"]
+
+    accessible = (masks_h[:, squares] != 0) | (masks_v[:, squares] != 0)
+    blocked = (
+        occupied[:, squares]
+        | (occupied[:, _ACCESS_ARRAYS["neighbors"]].sum(axis=2) >= 2)
+        | (occupied[:, _ACCESS_ARRAYS["pairs"][..., 0]] & occupied[:, _ACCESS_ARRAYS["pairs"][..., 1]]).any(axis=2)
+    )
+    reachable = (
+        _can_reach_batch(_ACCESS_ARRAYS["walks_h"], occupied, masks_h, flags_h)
+        | _can_reach_batch(_ACCESS_ARRAYS["walks_v"], occupied, masks_v, flags_v)
+    )
+    accessible |= ~blocked & reachable
+
+    is_tws = _ACCESS_ARRAYS["is_tws"]
+    return np.stack([accessible[:, is_tws].sum(axis=1), accessible[:, ~is_tws].sum(axis=1)], axis=1).astype(np.int32)
+
+
 def is_accessible_connection(
     start: Tuple[int, int],
     end: Tuple[int, int],
     board: Board,
-    crosscheck_board_h: CrossCheckBoard,
-    crosscheck_board_v: CrossCheckBoard,
+    crosscheck_board_h: AnyCrossCheckBoard,
+    crosscheck_board_v: AnyCrossCheckBoard,
     special_type: str
 ) -> bool:
     """
@@ -199,13 +251,29 @@ def is_accessible_connection(
         start (Tuple[int, int]): Coordinates of the first special tile.
         end (Tuple[int, int]): Coordinates of the second special tile.
         board (Board): 15x15 Scrabble board.
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
         special_type (str): The type of special tile combination (e.g., "TWS/TWS").
 
     Returns:
         bool: True if the special tile connection is accessible, False otherwise.
     """
+    return _is_accessible_connection(
+        start, end, board, *cross_check_grids(crosscheck_board_h), *cross_check_grids(crosscheck_board_v), special_type
+    )
+
+
+def _is_accessible_connection(
+    start: Tuple[int, int],
+    end: Tuple[int, int],
+    board: Board,
+    masks_h: List[List[int]],
+    flags_h: List[List[int]],
+    masks_v: List[List[int]],
+    flags_v: List[List[int]],
+    special_type: str
+) -> bool:
+    """`is_accessible_connection` over cross-check mask/flag grids."""
     r1, c1 = start
     r2, c2 = end
 
@@ -216,27 +284,27 @@ def is_accessible_connection(
     # Determine the direction of the connection
     if r1 == r2:  # Horizontal connection
         r, c_min, c_max = r1, min(c1, c2), max(c1, c2)
-        crosscheck_board = crosscheck_board_h
+        masks, flags = masks_h, flags_h
     else:  # Vertical connection
         c, r_min, r_max = c1, min(r1, r2), max(r1, r2)
-        crosscheck_board = crosscheck_board_v
+        masks, flags = masks_v, flags_v
 
     num_tiles_between = 0
     num_valid_cross_checks = 0
 
-    # Check if either start or end position has a cross-check
-    start_crosscheck = crosscheck_board[r1][c1] if crosscheck_board[r1][c1] and not crosscheck_board[r1][c1].is_open_square else None
-    end_crosscheck = crosscheck_board[r2][c2] if crosscheck_board[r2][c2] and not crosscheck_board[r2][c2].is_open_square else None
+    # Check if either start or end position has a cross-check (open squares don't count)
+    start_constrained = flags[r1][c1] == CROSS_CHECK_PRESENT
+    end_constrained = flags[r2][c2] == CROSS_CHECK_PRESENT
 
     # If either start or end position has a cross-check with an empty valid letter set, it's blocked
-    if (start_crosscheck and len(start_crosscheck.valid_letters) == 0) or \
-       (end_crosscheck and len(end_crosscheck.valid_letters) == 0):
+    if (start_constrained and masks[r1][c1] == 0) or \
+       (end_constrained and masks[r2][c2] == 0):
         return False
 
     # Count valid cross-checks at start and end positions
-    if start_crosscheck and len(start_crosscheck.valid_letters) > 0:
+    if start_constrained and masks[r1][c1] != 0:
         num_valid_cross_checks += 1
-    if end_crosscheck and len(end_crosscheck.valid_letters) > 0:
+    if end_constrained and masks[r2][c2] != 0:
         num_valid_cross_checks += 1
 
     # Iterate through all spaces between the two tiles
@@ -244,22 +312,20 @@ def is_accessible_connection(
         for c in range(c_min + 1, c_max):
             if board[r][c] is not None:
                 num_tiles_between += 1
-            elif crosscheck_board[r][c]:
-                crosscheck = crosscheck_board[r][c]
-                if crosscheck.is_open_square:
-                    continue
-                if len(crosscheck.valid_letters) == 0:
+            elif flags[r][c]:
+                if flags[r][c] != CROSS_CHECK_PRESENT:
+                    continue  # Open square
+                if masks[r][c] == 0:
                     return False  # Blocked because cross-check has no valid letters
                 num_valid_cross_checks += 1
     else:  # Vertical connection
         for r in range(r_min + 1, r_max):
             if board[r][c] is not None:
                 num_tiles_between += 1
-            elif crosscheck_board[r][c]:
-                crosscheck = crosscheck_board[r][c]
-                if crosscheck.is_open_square:
-                    continue
-                if len(crosscheck.valid_letters) == 0:
+            elif flags[r][c]:
+                if flags[r][c] != CROSS_CHECK_PRESENT:
+                    continue  # Open square
+                if masks[r][c] == 0:
                     return False  # Blocked because cross-check has no valid letters
                 num_valid_cross_checks += 1
 
@@ -280,15 +346,15 @@ def is_accessible_connection(
 
 
 def compute_accessible_special_connections(
-    board: Board, crosscheck_board_h: CrossCheckBoard, crosscheck_board_v: CrossCheckBoard
+    board: Board, crosscheck_board_h: AnyCrossCheckBoard, crosscheck_board_v: AnyCrossCheckBoard
 ) -> Dict[str, int]:
     """
     Computes the number of accessible special tile connections.
 
     Args:
         board (Board): 15x15 Scrabble board.
-        crosscheck_board_h (CrossCheckBoard): Horizontal cross-check constraints.
-        crosscheck_board_v (CrossCheckBoard): Vertical cross-check constraints.
+        crosscheck_board_h (AnyCrossCheckBoard): Horizontal cross-check constraints (packed or not).
+        crosscheck_board_v (AnyCrossCheckBoard): Vertical cross-check constraints (packed or not).
 
     Returns:
         Dict[str, int]: Dictionary with counts of accessible connections for each combination type.
@@ -300,10 +366,179 @@ def compute_accessible_special_connections(
         "DLS/TWS": 0
     }
 
+    grids = (*cross_check_grids(crosscheck_board_h), *cross_check_grids(crosscheck_board_v))
+
     for special_type, pairs in SPECIAL_TILES_CONNECTIONS.items():
         for start, end in pairs:
-            if is_accessible_connection(start, end, board, crosscheck_board_h, crosscheck_board_v, "/".join(special_type)):
+            if _is_accessible_connection(start, end, board, *grids, "/".join(special_type)):
                 accessible_connections["/".join(special_type)] += 1
 
     return accessible_connections
 
+
+def compute_accessible_special_connections_batch(
+    occupied: np.ndarray, crosscheck_boards_h: PackedCrossCheckBoard, crosscheck_boards_v: PackedCrossCheckBoard
+) -> Dict[str, np.ndarray]:
+    """
+    Batch version of `compute_accessible_special_connections` for N boards at once.
+
+    Args:
+        occupied (np.ndarray): (N, 15, 15) occupancy, boolean or packed square codes.
+        crosscheck_boards_h (PackedCrossCheckBoard): Stacked horizontal cross-checks (arrays of shape (N, 15, 15)).
+        crosscheck_boards_v (PackedCrossCheckBoard): Stacked vertical cross-checks.
+
+    Returns:
+        Dict[str, np.ndarray]: Combination type -> (N,) int32 counts of accessible connections.
+    """
+    occupied, masks_h, flags_h, masks_v, flags_v = _flat_batch(occupied, crosscheck_boards_h, crosscheck_boards_v)
+    spans = _CONNECTION_ARRAYS["span"]
+    vertical = _CONNECTION_ARRAYS["vertical"]
+
+    # Per square: an empty square with a usable / dead cross-check (open squares don't count)
+    cross_check_h = ~occupied & (flags_h == CROSS_CHECK_PRESENT)
+    cross_check_v = ~occupied & (flags_v == CROSS_CHECK_PRESENT)
+    valid = np.where(vertical, (cross_check_v & (masks_v != 0))[:, spans], (cross_check_h & (masks_h != 0))[:, spans])
+    dead = np.where(vertical, (cross_check_v & (masks_v == 0))[:, spans], (cross_check_h & (masks_h == 0))[:, spans])
+
+    tiles = occupied[:, spans].sum(axis=2)  # The endpoints must be empty, so only squares between count
+    cross_checks = valid.sum(axis=2)
+    endpoints_empty = ~occupied[:, _CONNECTION_ARRAYS["first"]] & ~occupied[:, _CONNECTION_ARRAYS["last"]]
+
+    usable = endpoints_empty & ~dead.any(axis=2) & (tiles <= 1) & (cross_checks <= 1) & (tiles + cross_checks > 0)
+    tws_tws = _CONNECTION_ARRAYS["tws_tws"]
+    usable &= ~tws_tws | ((tiles == 1) & (cross_checks == 0))
+
+    types = _CONNECTION_ARRAYS["type"]
+    return {
+        special_type: usable[:, types == index].sum(axis=1).astype(np.int32)
+        for index, special_type in enumerate(CONNECTION_TYPES)
+    }
+
+
+# ---------------------------------------------------------------------------
+# Precomputed premium-square geometry. Squares are flat indices row * 15 + col;
+# OFF_BOARD is an extra, always empty square standing in for anything past the
+# edge, so lookups need no bounds checks.
+# ---------------------------------------------------------------------------
+
+OFF_BOARD = 225
+
+CONNECTION_TYPES = ["/".join(special_type) for special_type in SPECIAL_TILES_CONNECTIONS]
+
+
+def _flat_index(row: int, col: int) -> int:
+    return row * 15 + col if 0 <= row < 15 and 0 <= col < 15 else OFF_BOARD
+
+
+class _AccessSquare:
+    """A TWS or DWS square with its blocking neighbours and the walks of `can_reach_within_7`."""
+    __slots__ = ("index", "tile_type", "neighbors", "blocking_pairs", "walks_h", "walks_v")
+
+    def __init__(self, row: int, col: int, tile_type: str):
+        self.index = _flat_index(row, col)
+        self.tile_type = tile_type
+        self.neighbors = [_flat_index(row + dr, col + dc) for dr, dc in ((0, -1), (0, 1), (-1, 0), (1, 0))]
+        self.blocking_pairs = [
+            (_flat_index(row + dr, col + dc), _flat_index(row + 2 * dr, col + 2 * dc))
+            for dr, dc in ((0, -1), (0, 1), (-1, 0), (1, 0))
+        ]
+        self.walks_h = [_walk(row, col, 0, -1), _walk(row, col, 0, 1)]
+        self.walks_v = [_walk(row, col, -1, 0), _walk(row, col, 1, 0)]
+
+
+def _walk(row: int, col: int, dr: int, dc: int) -> List[Tuple[int, int, int]]:
+    """(square, next square, the one after) for each of the up to 7 on-board steps of a walk."""
+    return [
+        (_flat_index(row + i * dr, col + i * dc),
+         _flat_index(row + (i + 1) * dr, col + (i + 1) * dc),
+         _flat_index(row + (i + 2) * dr, col + (i + 2) * dc))
+        for i in range(1, 8)
+        if 0 <= row + i * dr < 15 and 0 <= col + i * dc < 15
+    ]
+
+
+_ACCESS_SQUARES = [
+    _AccessSquare(row, col, SPECIAL_TILES_LOCATIONS[row][col])
+    for row in range(15) for col in range(15)
+    if SPECIAL_TILES_LOCATIONS[row][col] in {"TWS", "DWS"}
+]
+
+# (type, vertical, first square, last square, squares between) of every connection
+_CONNECTIONS = []
+for _special_type, _pairs in SPECIAL_TILES_CONNECTIONS.items():
+    for (_r1, _c1), (_r2, _c2) in _pairs:
+        if _r1 == _r2:
+            _between = [_flat_index(_r1, c) for c in range(min(_c1, _c2) + 1, max(_c1, _c2))]
+        else:
+            _between = [_flat_index(r, _c1) for r in range(min(_r1, _r2) + 1, max(_r1, _r2))]
+        _CONNECTIONS.append(("/".join(_special_type), _r1 != _r2, _flat_index(_r1, _c1), _flat_index(_r2, _c2), _between))
+
+
+def _padded_walks(walks: List[List[Tuple[int, int, int]]]) -> np.ndarray:
+    """(directions, 7, 3) walk steps; missing steps are flagged with square -1."""
+    result = np.full((len(walks), 7, 3), OFF_BOARD, dtype=np.intp)
+    result[:, :, 0] = -1
+    for direction, walk in enumerate(walks):
+        if walk:
+            result[direction, :len(walk)] = walk
+    return result
+
+
+_ACCESS_ARRAYS = {
+    "index": np.array([square.index for square in _ACCESS_SQUARES], dtype=np.intp),
+    "is_tws": np.array([square.tile_type == "TWS" for square in _ACCESS_SQUARES]),
+    "neighbors": np.array([square.neighbors for square in _ACCESS_SQUARES], dtype=np.intp),
+    "pairs": np.array([square.blocking_pairs for square in _ACCESS_SQUARES], dtype=np.intp),
+    "walks_h": np.stack([_padded_walks(square.walks_h) for square in _ACCESS_SQUARES]),
+    "walks_v": np.stack([_padded_walks(square.walks_v) for square in _ACCESS_SQUARES]),
+}
+
+_CONNECTION_ARRAYS = {
+    "type": np.array([CONNECTION_TYPES.index(connection[0]) for connection in _CONNECTIONS]),
+    "tws_tws": np.array([connection[0] == "TWS/TWS" for connection in _CONNECTIONS]),
+    "vertical": np.array([connection[1] for connection in _CONNECTIONS])[:, None],
+    "first": np.array([connection[2] for connection in _CONNECTIONS], dtype=np.intp),
+    "last": np.array([connection[3] for connection in _CONNECTIONS], dtype=np.intp),
+    # Endpoints and squares between, padded with OFF_BOARD
+    "span": np.array([
+        [first, last, *between] + [OFF_BOARD] * (13 - len(between))
+        for _, _, first, last, between in _CONNECTIONS
+    ], dtype=np.intp),
+}
+
+
+def _flat_batch(
+    occupied: np.ndarray, crosscheck_boards_h: PackedCrossCheckBoard, crosscheck_boards_v: PackedCrossCheckBoard
+) -> Tuple[np.ndarray, ...]:
+    """(N, 226) occupancy and cross-check masks/flags, the last column being OFF_BOARD."""
+    occupied = np.asarray(occupied) != 0
+    arrays = [occupied, crosscheck_boards_h.letter_masks, crosscheck_boards_h.flags,
+              crosscheck_boards_v.letter_masks, crosscheck_boards_v.flags]
+    return tuple(
+        np.concatenate([array.reshape(len(array), 225), np.zeros((len(array), 1), dtype=array.dtype)], axis=1)
+        for array in arrays
+    )
+
+
+def _can_reach_batch(walks: np.ndarray, occupied: np.ndarray, masks: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """
+    `can_reach_within_7` for every (board, square) over (squares, directions, 7, 3) walks;
+    True where any of the directions gives access.
+    """
+    squares, following, after = walks[..., 0], walks[..., 1], walks[..., 2]
+    on_board = squares >= 0
+    squares = np.where(on_board, squares, OFF_BOARD)
+
+    tile = occupied[:, squares]
+    cross_check = flags[:, squares] == CROSS_CHECK_PRESENT
+    outcome = np.where(
+        tile,
+        ~occupied[:, following],
+        (masks[:, squares] != 0) & ~(occupied[:, following] & occupied[:, after]),
+    )
+
+    # The first tile or cross-check decides; stepping off the board (or past 7) is a dead end
+    stop = tile | cross_check | ~on_board
+    first = stop.argmax(axis=-1)[..., None]
+    reached = stop.any(axis=-1) & np.take_along_axis(outcome & on_board, first, axis=-1)[..., 0]
+    return reached.any(axis=-1)
@@ -0,0 +1,87 @@
+import numpy as np
+from typing import Sequence, Tuple
+
+from game_logic.utils import TILE_ORDER, TILE_DIST
+
+NUM_TILE_TYPES = len(TILE_ORDER)  # 26 letters and the blank
+BLANK_INDEX = TILE_ORDER.index("?")
+
+# Full bag, in TILE_ORDER
+TILE_DIST_VECTOR = np.array([TILE_DIST[tile] for tile in TILE_ORDER], dtype=np.int32)
+
+# Byte -> tile index. NUM_TILE_TYPES marks bytes that are not tiles (run lengths,
+# slashes, separators); they land in an extra bin that is dropped.
+_BOARD_BYTE_TO_TILE = np.full(256, NUM_TILE_TYPES, dtype=np.int64)
+_RACK_BYTE_TO_TILE = np.full(256, NUM_TILE_TYPES, dtype=np.int64)
+for _index, _tile in enumerate(TILE_ORDER):
+    _RACK_BYTE_TO_TILE[ord(_tile)] = _index
+    if _tile.isalpha():
+        _BOARD_BYTE_TO_TILE[ord(_tile)] = _index
+        _BOARD_BYTE_TO_TILE[ord(_tile.lower())] = BLANK_INDEX  # Lowercase letters are played blanks
+
+_SEPARATOR = ord("\n")
+
+
+def count_tiles(strings: Sequence[str], byte_to_tile: np.ndarray) -> np.ndarray:
+    """
+    Counts tiles in many strings at once.
+
+    The strings are joined into one byte buffer, mapped to tile indices through
+    a lookup table and counted with a single `bincount` over (row, tile) bins.
+
+    Args:
+        strings (Sequence[str]): One string per row (no newlines).
+        byte_to_tile (np.ndarray): 256-entry table from byte to tile index,
+            NUM_TILE_TYPES for bytes to ignore.
+
+    Returns:
+        np.ndarray: Array of shape (N, 27) and dtype int32, columns in TILE_ORDER.
+    """
+    rows = len(strings)
+    if rows == 0:
+        return np.zeros((0, NUM_TILE_TYPES), dtype=np.int32)
+
+    # Non-ASCII characters are never tiles; dropping them keeps the separators in place
+    data = np.frombuffer("\n".join(strings).encode("ascii", errors="ignore"), dtype=np.uint8)
+    separators = data == _SEPARATOR
+    if np.count_nonzero(separators) != rows - 1:
+        raise ValueError("Strings to count must not contain newlines")
+
+    row_ids = np.cumsum(separators)
+    bins = row_ids * (NUM_TILE_TYPES + 1) + byte_to_tile[data]
+    counts = np.bincount(bins, minlength=rows * (NUM_TILE_TYPES + 1))
+    return counts.reshape(rows, NUM_TILE_TYPES + 1)[:, :NUM_TILE_TYPES].astype(np.int32)
+
+
+def tile_count_matrices(
+    board_reps: Sequence[str], leaves: Sequence[str]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batch version of the leave and unseen tile counts of `parse_scrabble_line`.
+
+    Args:
+        board_reps (Sequence[str]): Run-tile board strings (lowercase letters are blanks).
+        leaves (Sequence[str]): Rack strings, as in the dataset's second field
+            ("/" separators and other non-tile characters are ignored).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - (N, 27) int8 leave counts, columns in TILE_ORDER.
+            - (N, 27) int8 unseen counts: full bag minus board and leave tiles
+              (clipped to the int8 range).
+            - (N,) bool, False for impossible rows, i.e. rows with a negative
+              unseen count (more copies of a tile than the bag holds).
+    """
+    if len(board_reps) != len(leaves):
+        raise ValueError(f"Got {len(board_reps)} boards but {len(leaves)} leaves")
+
+    leave_counts = count_tiles(leaves, _RACK_BYTE_TO_TILE)
+    unseen_counts = TILE_DIST_VECTOR - count_tiles(board_reps, _BOARD_BYTE_TO_TILE) - leave_counts
+    possible = (unseen_counts >= 0).all(axis=1)
+
+    int8 = np.iinfo(np.int8)
+    return (
+        leave_counts.astype(np.int8),
+        np.clip(unseen_counts, int8.min, int8.max).astype(np.int8),
+        possible,
+    )
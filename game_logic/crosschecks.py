@@ -1,9 +1,40 @@
-from typing import Dict, Set
-from game_logic.dawg import DAWG
-from game_logic.types import Board, CrossCheck, CrossCheckBoard, open_square_cross_check
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from game_logic.dawg import Lexicon
+from game_logic.types import Board, CrossCheck, CrossCheckBoard, PackedCrossCheckBoard, open_square_cross_check
 from game_logic.utils import get_tile_value
 
-def find_anchors_with_cross_checks(board: Board, dawg: DAWG) -> CrossCheckBoard:
+def find_anchors_with_cross_checks(
+    board: Board, dawg: Lexicon, packed: bool = False
+) -> Union[CrossCheckBoard, PackedCrossCheckBoard]:
+    """
+    Computes cross-checks for every anchor square (empty squares next to a tile).
+    The cross-word is read vertically, i.e. these constrain horizontal plays.
+
+    Args:
+        board (Board): The Scrabble board (15x15 grid).
+        dawg (Lexicon): The lexicon used to validate cross-words.
+        packed (bool): Return a PackedCrossCheckBoard instead of a grid of CrossCheck objects.
+
+    Returns:
+        The cross-check board, with None (or no flags) on non-anchor squares.
+    """
+    if packed:
+        packed_board = PackedCrossCheckBoard()
+        if board[7][7] is None:
+            packed_board.set(7, 7, open_square_cross_check.letter_mask, 0, True)
+            return packed_board
+
+        for row in range(len(board)):
+            for col in range(len(board[row])):
+                if board[row][col] is None and has_adjacent_tile(board, row, col):
+                    cross_check = compute_cross_check(board, row, col, dawg)
+                    packed_board.set(
+                        row, col, cross_check.letter_mask, cross_check.partial_sum, cross_check.is_open_square
+                    )
+
+        return packed_board
+
     cross_check_board: CrossCheckBoard = [[None for _ in range(15)] for _ in range(15)]
 
     if board[7][7] is None:
@@ -18,6 +49,191 @@ def find_anchors_with_cross_checks(board: Board, dawg: DAWG) -> CrossCheckBoard:
 
     return cross_check_board
 
+def find_cross_checks_both(
+    board: Board, dawg: Lexicon, packed: bool = False
+) -> Tuple[Union[CrossCheckBoard, PackedCrossCheckBoard], Union[CrossCheckBoard, PackedCrossCheckBoard]]:
+    """
+    Computes horizontal and vertical cross-checks in a single sweep.
+
+    Equivalent to `find_anchors_with_cross_checks(board)` and
+    `transpose(find_anchors_with_cross_checks(transpose(board)))`, but every run
+    of tiles is read once and shared by the empty squares at both of its ends,
+    and anchors are found once for both orientations.
+
+    Args:
+        board (Board): The Scrabble board (15x15 grid).
+        dawg (Lexicon): The lexicon used to validate cross-words.
+        packed (bool): Return PackedCrossCheckBoards instead of grids of CrossCheck objects.
+
+    Returns:
+        (cs_h, cs_v): Cross-checks for horizontal plays (vertical cross-words)
+        and for vertical plays (horizontal cross-words).
+    """
+    if packed:
+        cs_h, cs_v = PackedCrossCheckBoard(), PackedCrossCheckBoard()
+    else:
+        cs_h = [[None for _ in range(15)] for _ in range(15)]
+        cs_v = [[None for _ in range(15)] for _ in range(15)]
+
+    if board[7][7] is None:
+        _store_cross_check(cs_h, 7, 7, open_square_cross_check)
+        _store_cross_check(cs_v, 7, 7, open_square_cross_check)
+        return cs_h, cs_v
+
+    above, below = _runs_next_to_empty_squares(board, vertical=True)
+    left, right = _runs_next_to_empty_squares(board, vertical=False)
+
+    # Every anchor touches at least one run, so the run tables list all of them.
+    masks: Dict[Tuple[str, str], int] = {}
+    for square in set(above) | set(below) | set(left) | set(right):
+        row, col = square
+        _store_cross_check(cs_h, row, col, _cross_check_from_runs(above.get(square), below.get(square), dawg, masks))
+        _store_cross_check(cs_v, row, col, _cross_check_from_runs(left.get(square), right.get(square), dawg, masks))
+
+    return cs_h, cs_v
+
+def update_cross_checks(
+    cs_h: Union[CrossCheckBoard, PackedCrossCheckBoard],
+    cs_v: Union[CrossCheckBoard, PackedCrossCheckBoard],
+    board: Board,
+    placed_tiles: Iterable[Tuple[int, ...]],
+    dawg: Lexicon,
+) -> List[Tuple[int, int]]:
+    """
+    Patches cross-check boards in place after a move instead of recomputing them.
+
+    Only the squares a move can affect are touched: the squares the tiles
+    landed on (cleared) and the empty squares at both ends of every row and
+    column run passing through a new tile, which include all new anchors.
+    The result is identical to `find_cross_checks_both` on the new board.
+
+    Args:
+        cs_h: Cross-checks for horizontal plays before the move (list or packed form).
+        cs_v: Cross-checks for vertical plays before the move (list or packed form).
+        board (Board): The board after the move (already holding the placed tiles).
+        placed_tiles: (row, col, ...) tuples of the newly placed tiles; extra fields are ignored.
+        dawg (Lexicon): The lexicon used to validate cross-words.
+
+    Returns:
+        List[Tuple[int, int]]: The empty squares whose cross-checks were recomputed.
+    """
+    placed = [(tile[0], tile[1]) for tile in placed_tiles]
+
+    if board[7][7] is None:
+        return []  # Still the opening position; only the centre square is an anchor
+
+    if (7, 7) in placed:
+        # Opening move: tiles off the centre were ignored until now, so start over.
+        fresh_h, fresh_v = find_cross_checks_both(board, dawg, packed=isinstance(cs_h, PackedCrossCheckBoard))
+        _copy_cross_checks(fresh_h, cs_h)
+        _copy_cross_checks(fresh_v, cs_v)
+        return [
+            (row, col) for row in range(15) for col in range(15)
+            if board[row][col] is None and has_adjacent_tile(board, row, col)
+        ]
+
+    affected = set()
+    for row, col in placed:
+        _clear_cross_check(cs_h, row, col)
+        _clear_cross_check(cs_v, row, col)
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + dr, col + dc
+            while 0 <= r < 15 and 0 <= c < 15 and board[r][c] is not None:
+                r, c = r + dr, c + dc
+            if 0 <= r < 15 and 0 <= c < 15:
+                affected.add((r, c))
+
+    masks: Dict[Tuple[str, str], int] = {}
+    for row, col in affected:
+        _store_cross_check(cs_h, row, col, _cross_check_from_runs(
+            _read_run(board, row, col, -1, 0), _read_run(board, row, col, 1, 0), dawg, masks
+        ))
+        _store_cross_check(cs_v, row, col, _cross_check_from_runs(
+            _read_run(board, row, col, 0, -1), _read_run(board, row, col, 0, 1), dawg, masks
+        ))
+
+    return sorted(affected)
+
+def _read_run(board: Board, row: int, col: int, dr: int, dc: int) -> Optional[Tuple[str, int]]:
+    """(letters, score) of the run of tiles next to (row, col) in direction (dr, dc), in reading order."""
+    letters = []
+    total = 0
+    r, c = row + dr, col + dc
+    while 0 <= r < 15 and 0 <= c < 15 and board[r][c] is not None:
+        letters.append(board[r][c])
+        total += get_tile_value(board[r][c])
+        r, c = r + dr, c + dc
+
+    if not letters:
+        return None
+    if dr < 0 or dc < 0:
+        letters.reverse()
+    return "".join(letters), total
+
+def _runs_next_to_empty_squares(board: Board, vertical: bool) -> Tuple[Dict, Dict]:
+    """
+    Maps empty squares to the (letters, score) of the run of tiles directly
+    before and directly after them, reading down columns or across rows.
+    """
+    before: Dict[Tuple[int, int], Tuple[str, int]] = {}
+    after: Dict[Tuple[int, int], Tuple[str, int]] = {}
+
+    for line in range(15):
+        start = None
+        letters = ""
+        total = 0
+        for i in range(16):
+            tile = None if i == 15 else (board[i][line] if vertical else board[line][i])
+            if tile is not None:
+                if start is None:
+                    start, letters, total = i, "", 0
+                letters += tile
+                total += get_tile_value(tile)
+            elif start is not None:
+                run = (letters, total)
+                if start > 0:
+                    after[(start - 1, line) if vertical else (line, start - 1)] = run
+                if i < 15:
+                    before[(i, line) if vertical else (line, i)] = run
+                start = None
+
+    return before, after
+
+def _cross_check_from_runs(prefix_run, suffix_run, dawg: Lexicon, masks: Dict[Tuple[str, str], int]) -> CrossCheck:
+    if prefix_run is None and suffix_run is None:
+        return open_square_cross_check
+
+    prefix, prefix_sum = prefix_run if prefix_run is not None else ("", 0)
+    suffix, suffix_sum = suffix_run if suffix_run is not None else ("", 0)
+
+    mask = masks.get((prefix, suffix))
+    if mask is None:
+        mask = masks[(prefix, suffix)] = dawg.cross_check_mask(prefix, suffix)
+
+    return CrossCheck.from_mask(mask, prefix_sum + suffix_sum, False)
+
+def _store_cross_check(cross_check_board, row: int, col: int, cross_check: CrossCheck) -> None:
+    if isinstance(cross_check_board, PackedCrossCheckBoard):
+        cross_check_board.set(row, col, cross_check.letter_mask, cross_check.partial_sum, cross_check.is_open_square)
+    else:
+        cross_check_board[row][col] = cross_check
+
+def _copy_cross_checks(source, target) -> None:
+    if isinstance(target, PackedCrossCheckBoard):
+        source = source if isinstance(source, PackedCrossCheckBoard) else PackedCrossCheckBoard.from_cross_check_board(source)
+        target.letter_masks[...] = source.letter_masks
+        target.partial_sums[...] = source.partial_sums
+        target.flags[...] = source.flags
+    else:
+        for row in range(15):
+            target[row][:] = [source.get(row, col) for col in range(15)] if isinstance(source, PackedCrossCheckBoard) else source[row]
+
+def _clear_cross_check(cross_check_board, row: int, col: int) -> None:
+    if isinstance(cross_check_board, PackedCrossCheckBoard):
+        cross_check_board.clear(row, col)
+    else:
+        cross_check_board[row][col] = None
+
 def has_adjacent_tile(board: Board, row: int, col: int) -> bool:
     return (
         (row > 0 and board[row - 1][col] is not None) or
@@ -26,18 +242,13 @@ def has_adjacent_tile(board: Board, row: int, col: int) -> bool:
         (col < len(board[0]) - 1 and board[row][col + 1] is not None)
     )
 
-def compute_cross_check(board: Board, row: int, col: int, dawg: DAWG) -> CrossCheck:
-    valid_letters: Set[str] = set()
+def compute_cross_check(board: Board, row: int, col: int, dawg: Lexicon) -> CrossCheck:
     prefix, suffix, partial_sum = get_adjacent_letters_and_sum(board, row, col)
 
     if prefix == "" and suffix == "":
         return open_square_cross_check
 
-    for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
-        if dawg.is_valid_word(prefix + letter + suffix):
-            valid_letters.add(letter)
-
-    return CrossCheck(valid_letters, partial_sum, False)
+    return CrossCheck.from_mask(dawg.cross_check_mask(prefix, suffix), partial_sum, False)
 
 def get_adjacent_letters_and_sum(board: Board, row: int, col: int) -> tuple:
     prefix, suffix, partial_sum = "", "", 0
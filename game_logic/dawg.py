@@ -1,5 +1,41 @@
+import mmap
 import struct
-from typing import Dict, Tuple, List
+import sys
+import time
+from array import array
+from typing import Dict, Tuple, List, Iterator, Optional, Union
+
+from game_logic.types import LETTER_BITS
+
+# Both versioned file formats start with the same 16-byte little-endian
+# header: an 8-byte magic, a format version, a reserved field and an item count.
+# Files without a header are the original recursive node format.
+_FILE_HEADER = struct.Struct("<8sHHI")
+
+# Node table layout: one record per node (root first) holding a flags byte,
+# a child count byte, then (letter byte, uint32 child index) per child.
+# Shared nodes are written once, so minimized DAWGs stay minimized.
+DAWG_MAGIC = b"DAWGNODE"
+DAWG_VERSION = 1
+_NODE_RECORD = struct.Struct("<BB")
+_NODE_EDGE = struct.Struct("<BI")
+
+# Legacy (headerless) layout: is_word byte, big-endian child count, then per
+# child its letter, the big-endian byte length of its subtree and the subtree.
+_LEGACY_NODE = struct.Struct(">BI")
+_LEGACY_EDGE = struct.Struct(">cI")
+
+# Flat DAWG layout: the header followed by an array of little-endian
+# uint32 edges. Each edge packs the letter byte, a terminal flag for the node
+# it leads to, an end-of-list flag, and the index of the first edge of the
+# child node's edge list (0 = no children). Edge 0 is a pseudo-edge into the root.
+FLAT_DAWG_MAGIC = b"DAWGFLAT"
+FLAT_DAWG_VERSION = 1
+_LETTER_MASK = 0xFF
+_TERMINAL_BIT = 1 << 8
+_LAST_BIT = 1 << 9
+_CHILD_SHIFT = 10
+_MAX_FLAT_EDGES = 1 << (32 - _CHILD_SHIFT)
 
 class DawgNode:
     def __init__(self):
@@ -13,40 +49,67 @@ class DawgNode:
         return self.children.get(char)
 
     def serialize(self) -> bytes:
-        """Convert the DAWG node into a binary format."""
-        children_serialized = b"".join(
-            char.encode("utf-8") + struct.pack(">I", len(child.serialize())) + child.serialize()
-            for char, child in self.children.items()
-        )
+        """Convert the DAWG node into the legacy (headerless) binary format."""
+        # Subtree sizes first (post-order), so each length prefix is known
+        # before its subtree is written and nothing is encoded twice.
+        sizes: Dict[int, int] = {}
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            pending = [child for child in node.children.values() if id(child) not in sizes]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            sizes[id(node)] = _LEGACY_NODE.size + sum(
+                _LEGACY_EDGE.size + sizes[id(child)] for child in node.children.values()
+            )
 
-        is_word_byte = struct.pack(">B", 1 if self.is_word else 0)
-        children_count = struct.pack(">I", len(self.children))
+        buffer = bytearray(sizes[id(self)])
+        offset = 0
+        to_write: List[Tuple[Optional[str], DawgNode]] = [(None, self)]
+        while to_write:
+            char, node = to_write.pop()
+            if char is not None:
+                _LEGACY_EDGE.pack_into(buffer, offset, char.encode("utf-8"), sizes[id(node)])
+                offset += _LEGACY_EDGE.size
+            _LEGACY_NODE.pack_into(buffer, offset, 1 if node.is_word else 0, len(node.children))
+            offset += _LEGACY_NODE.size
+            to_write.extend(reversed(list(node.children.items())))
 
-        return is_word_byte + children_count + children_serialized
+        return bytes(buffer)
 
     @staticmethod
     def deserialize(buffer: bytes, offset: int = 0) -> Tuple["DawgNode", int]:
-        """Reconstruct a DAWG node from a binary format."""
-        node = DawgNode()
+        """Reconstruct a DAWG node from the legacy binary format."""
+        view = memoryview(buffer)
 
-        node.is_word = struct.unpack(">B", buffer[offset:offset + 1])[0] == 1
-        offset += 1
+        root = DawgNode()
+        is_word, children_count = _LEGACY_NODE.unpack_from(view, offset)
+        offset += _LEGACY_NODE.size
+        root.is_word = is_word == 1
 
-        children_count = struct.unpack(">I", buffer[offset:offset + 4])[0]
-        offset += 4
+        # Each stack entry is a node and the number of its children still to read.
+        stack = [[root, children_count]]
+        while stack:
+            top = stack[-1]
+            if not top[1]:
+                stack.pop()
+                continue
+            top[1] -= 1
 
-        for _ in range(children_count):
-            char = buffer[offset:offset + 1].decode("utf-8")
-            offset += 1
+            char = view[offset:offset + 1].tobytes().decode("utf-8")
+            offset += _LEGACY_EDGE.size  # Subtree length is implied by the walk.
 
-            child_length = struct.unpack(">I", buffer[offset:offset + 4])[0]
-            offset += 4
+            child = DawgNode()
+            is_word, children_count = _LEGACY_NODE.unpack_from(view, offset)
+            offset += _LEGACY_NODE.size
+            child.is_word = is_word == 1
 
-            child_node, new_offset = DawgNode.deserialize(buffer, offset)
-            node.add_child(char, child_node)
-            offset = new_offset
+            top[0].add_child(char, child)
+            stack.append([child, children_count])
 
-        return node, offset
+        return root, offset
 
 
 class DAWG:
@@ -54,7 +117,12 @@ class DAWG:
         self.root = DawgNode()
 
     def insert(self, word: str) -> None:
-        """Insert a word into the DAWG."""
+        """
+        Insert a word into the DAWG.
+
+        Only valid on DAWGs grown through `insert`; nodes of a minimized DAWG
+        (see `DawgBuilder`) are shared, so inserting into one corrupts it.
+        """
         current_node = self.root
         for char in word:
             if char not in current_node.children:
@@ -72,6 +140,41 @@ class DAWG:
                 return False
         return current_node.is_word
 
+    def cross_check_mask(self, prefix: str, suffix: str) -> int:
+        """
+        Computes which letters can fill the gap in `prefix + ? + suffix`.
+
+        The prefix is walked once; the suffix is then only followed from the
+        children that actually exist below it.
+
+        Args:
+            prefix (str): Letters before the gap.
+            suffix (str): Letters after the gap.
+
+        Returns:
+            int: 26-bit mask with bit i set if chr(ord("A") + i) forms a word.
+        """
+        node = self.root
+        for char in prefix.upper():
+            node = node.get_child(char)
+            if node is None:
+                return 0
+
+        suffix = suffix.upper()
+        mask = 0
+        for char, child in node.children.items():
+            bit = LETTER_BITS.get(char)
+            if bit is None:
+                continue
+            for suffix_char in suffix:
+                child = child.get_child(suffix_char)
+                if child is None:
+                    break
+            else:
+                if child.is_word:
+                    mask |= bit
+        return mask
+
     def get_all_words(self) -> List[str]:
         """Retrieve all words stored in the DAWG."""
         words = []
@@ -85,11 +188,415 @@ class DAWG:
         collect_words(self.root, "")
         return words
 
-    def serialize(self) -> bytes:
-        """Serialize the entire DAWG into binary format."""
-        return self.root.serialize()
+    def serialize(self, legacy: bool = False) -> bytes:
+        """
+        Serialize the entire DAWG into binary format.
+
+        Args:
+            legacy (bool): Write the original headerless format instead of the
+                versioned node table (which keeps shared nodes shared).
+
+        Returns:
+            bytes: The serialized DAWG.
+        """
+        if legacy:
+            return self.root.serialize()
+
+        index: Dict[int, int] = {id(self.root): 0}
+        ordered_nodes = [self.root]
+        position = 0
+        while position < len(ordered_nodes):
+            node = ordered_nodes[position]
+            position += 1
+            for child in node.children.values():
+                if id(child) not in index:
+                    index[id(child)] = len(ordered_nodes)
+                    ordered_nodes.append(child)
+
+        parts = [_FILE_HEADER.pack(DAWG_MAGIC, DAWG_VERSION, 0, len(ordered_nodes))]
+        for node in ordered_nodes:
+            if len(node.children) > 0xFF:
+                raise ValueError("Nodes with more than 255 children cannot be serialized")
+            parts.append(_NODE_RECORD.pack(1 if node.is_word else 0, len(node.children)))
+            for char, child in node.children.items():
+                parts.append(_NODE_EDGE.pack(ord(char), index[id(child)]))
+
+        return b"".join(parts)
 
     def deserialize(self, data: bytes) -> None:
-        """Deserialize binary data to reconstruct the DAWG."""
-        root, _ = DawgNode.deserialize(data)
-        self.root = root
\ No newline at end of file
+        """Deserialize binary data (versioned or legacy format) to reconstruct the DAWG."""
+        view = memoryview(data)
+        if view[:len(DAWG_MAGIC)] != DAWG_MAGIC:
+            self.root, _ = DawgNode.deserialize(view)
+            return
+
+        _, version, _, node_count = _FILE_HEADER.unpack_from(view)
+        if version != DAWG_VERSION:
+            raise ValueError(f"Unsupported DAWG version {version}")
+
+        nodes = [DawgNode() for _ in range(node_count)]
+        offset = _FILE_HEADER.size
+        for node in nodes:
+            is_word, children_count = _NODE_RECORD.unpack_from(view, offset)
+            offset += _NODE_RECORD.size
+            node.is_word = is_word == 1
+            for _ in range(children_count):
+                letter, child_index = _NODE_EDGE.unpack_from(view, offset)
+                offset += _NODE_EDGE.size
+                node.children[chr(letter)] = nodes[child_index]
+
+        self.root = nodes[0]
+
+    def count_nodes_and_edges(self) -> Tuple[int, int]:
+        """Count distinct nodes and edges, counting shared nodes once."""
+        seen = {id(self.root)}
+        stack = [self.root]
+        edges = 0
+        while stack:
+            node = stack.pop()
+            edges += len(node.children)
+            for child in node.children.values():
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    stack.append(child)
+        return len(seen), edges
+
+    def serialize_flat(self) -> bytes:
+        """Serialize the DAWG into the flat, memory-mappable edge array format."""
+        return serialize_flat(self.root)
+
+
+class DawgBuilder:
+    """
+    Incrementally builds a minimal DAWG from words inserted in sorted order.
+
+    After each insertion, the part of the previous word that is no longer
+    shared with the new one can never change again, so its nodes are merged
+    with an equivalent node from the register (same terminal flag and same
+    children) or added to it (Daciuk et al., 2000).
+    """
+
+    def __init__(self):
+        self.root = DawgNode()
+        self.word_count = 0
+        self._previous_word = ""
+        self._unchecked: List[Tuple[DawgNode, str, DawgNode]] = []
+        self._register: Dict[tuple, DawgNode] = {}
+
+    def insert(self, word: str) -> None:
+        """Insert a word; words must arrive in sorted order (duplicates are skipped)."""
+        if word == self._previous_word and self.word_count:
+            return
+        if word < self._previous_word:
+            raise ValueError(f"Words must be inserted in sorted order: {word!r} after {self._previous_word!r}")
+
+        common_prefix = 0
+        for a, b in zip(word, self._previous_word):
+            if a != b:
+                break
+            common_prefix += 1
+
+        self._minimize(common_prefix)
+
+        node = self._unchecked[-1][2] if self._unchecked else self.root
+        for char in word[common_prefix:]:
+            child = DawgNode()
+            node.add_child(char, child)
+            self._unchecked.append((node, char, child))
+            node = child
+
+        node.is_word = True
+        self._previous_word = word
+        self.word_count += 1
+
+    def finish(self) -> "DAWG":
+        """Minimize the remaining nodes and return the finished DAWG."""
+        self._minimize(0)
+        dawg = DAWG()
+        dawg.root = self.root
+        return dawg
+
+    def _minimize(self, down_to: int) -> None:
+        while len(self._unchecked) > down_to:
+            parent, char, child = self._unchecked.pop()
+            signature = (child.is_word, tuple((c, id(n)) for c, n in child.children.items()))
+            existing = self._register.get(signature)
+            if existing is not None:
+                parent.children[char] = existing
+            else:
+                self._register[signature] = child
+
+
+def build_dawg_from_word_list(file_path: str) -> "DAWG":
+    """
+    Builds a minimized DAWG from a plain word list (one word per line).
+
+    Words are upper-cased and sorted before insertion. Build time and the
+    resulting node/edge counts are printed so lexicons can be compared.
+
+    Args:
+        file_path (str): Path to the word list.
+
+    Returns:
+        DAWG: The minimized DAWG.
+    """
+    start_time = time.time()
+
+    with open(file_path, "r") as file:
+        words = sorted({line.strip().upper() for line in file if line.strip()})
+
+    builder = DawgBuilder()
+    for word in words:
+        builder.insert(word)
+    dawg = builder.finish()
+
+    elapsed_time = time.time() - start_time
+    node_count, edge_count = dawg.count_nodes_and_edges()
+    print(f"DAWG built in {elapsed_time:.4f} seconds: {len(words)} words, {node_count} nodes, {edge_count} edges")
+
+    return dawg
+
+
+def serialize_flat(root: DawgNode) -> bytes:
+    """
+    Encode a DAWG rooted at `root` as a flat edge array (see `FlatDAWG`).
+
+    Nodes shared between several parents are written once, so a minimized
+    DAWG keeps its size on disk.
+
+    Args:
+        root (DawgNode): Root node of the DAWG.
+
+    Returns:
+        bytes: The header followed by the packed edge array.
+    """
+    list_start: Dict[int, int] = {}
+    ordered_nodes: List[DawgNode] = []
+    next_free = 1
+
+    if root.children:
+        list_start[id(root)] = next_free
+        ordered_nodes.append(root)
+        next_free += len(root.children)
+
+    # Breadth-first assignment of edge-list positions to every distinct node.
+    position = 0
+    while position < len(ordered_nodes):
+        node = ordered_nodes[position]
+        position += 1
+        for char in sorted(node.children):
+            child = node.children[char]
+            if child.children and id(child) not in list_start:
+                list_start[id(child)] = next_free
+                ordered_nodes.append(child)
+                next_free += len(child.children)
+
+    if next_free > _MAX_FLAT_EDGES:
+        raise ValueError(f"DAWG has {next_free} edges, flat format supports at most {_MAX_FLAT_EDGES}")
+
+    edges = array("I", bytes(4 * next_free))
+    edges[0] = (
+        (_TERMINAL_BIT if root.is_word else 0) | _LAST_BIT | (list_start.get(id(root), 0) << _CHILD_SHIFT)
+    )
+
+    for node in ordered_nodes:
+        index = list_start[id(node)]
+        chars = sorted(node.children)
+        for i, char in enumerate(chars):
+            child = node.children[char]
+            letter = ord(char)
+            if letter > _LETTER_MASK:
+                raise ValueError(f"Letter {char!r} cannot be stored in the flat DAWG format")
+            edges[index + i] = (
+                letter
+                | (_TERMINAL_BIT if child.is_word else 0)
+                | (_LAST_BIT if i == len(chars) - 1 else 0)
+                | (list_start.get(id(child), 0) << _CHILD_SHIFT)
+            )
+
+    if sys.byteorder != "little":
+        edges.byteswap()
+
+    return _FILE_HEADER.pack(FLAT_DAWG_MAGIC, FLAT_DAWG_VERSION, 0, next_free) + edges.tobytes()
+
+
+class FlatDAWG:
+    """
+    Read-only DAWG walked directly over a flat edge array.
+
+    Nodes are plain integers (the index of the edge leading into them, the root
+    is 0), so lookups allocate no per-node Python objects. When loaded with
+    `FlatDAWG.load`, the edge array is memory-mapped and shared between
+    processes through the page cache.
+    """
+
+    def __init__(self, buffer) -> None:
+        view = memoryview(buffer)
+        if len(view) < _FILE_HEADER.size:
+            raise ValueError("Buffer is too small to hold a flat DAWG")
+
+        magic, version, _, edge_count = _FILE_HEADER.unpack_from(view)
+        if magic != FLAT_DAWG_MAGIC:
+            raise ValueError("Buffer is not a flat DAWG")
+        if version != FLAT_DAWG_VERSION:
+            raise ValueError(f"Unsupported flat DAWG version {version}")
+
+        end = _FILE_HEADER.size + 4 * edge_count
+        if len(view) < end:
+            raise ValueError("Flat DAWG buffer is truncated")
+
+        edges = view[_FILE_HEADER.size:end].cast("I")
+        if sys.byteorder != "little":
+            edges = array("I", edges)
+            edges.byteswap()
+
+        self._buffer = buffer
+        self._view = view
+        self._edges = edges
+        self.edge_count = edge_count
+        self.root = 0
+        self.path: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str) -> "FlatDAWG":
+        """Memory-map a flat DAWG file without copying it into the heap."""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        dawg = cls(mapped)
+        dawg.path = path
+        return dawg
+
+    def __reduce__(self):
+        # Memory-mapped DAWGs are re-mapped from their file by other processes.
+        if self.path is not None:
+            return FlatDAWG.load, (self.path,)
+        return FlatDAWG, (self._view.tobytes(),)
+
+    @classmethod
+    def from_dawg(cls, dawg: "DAWG") -> "FlatDAWG":
+        """Build an in-memory flat DAWG from a node-based DAWG."""
+        return cls(dawg.serialize_flat())
+
+    def close(self) -> None:
+        """Release the underlying buffer (unmaps the file for `load`ed DAWGs)."""
+        if isinstance(self._edges, memoryview):
+            self._edges.release()
+        self._view.release()
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def get_child(self, node: int, char: str) -> Optional[int]:
+        """Return the child of `node` reached through `char`, or None."""
+        edges = self._edges
+        index = edges[node] >> _CHILD_SHIFT
+        if not index:
+            return None
+
+        letter = ord(char)
+        while True:
+            edge = edges[index]
+            edge_letter = edge & _LETTER_MASK
+            if edge_letter == letter:
+                return index
+            if edge_letter > letter or edge & _LAST_BIT:
+                return None
+            index += 1
+
+    def is_terminal(self, node: int) -> bool:
+        """Return True if the path to `node` spells a complete word."""
+        return bool(self._edges[node] & _TERMINAL_BIT)
+
+    def children(self, node: int) -> Iterator[Tuple[str, int]]:
+        """Yield (letter, child node) pairs of `node` in letter order."""
+        edges = self._edges
+        index = edges[node] >> _CHILD_SHIFT
+        while index:
+            edge = edges[index]
+            yield chr(edge & _LETTER_MASK), index
+            index = 0 if edge & _LAST_BIT else index + 1
+
+    def is_valid_word(self, word: str) -> bool:
+        """Check if a word exists in the DAWG."""
+        node = self.root
+        for char in word.upper():
+            node = self.get_child(node, char)
+            if node is None:
+                return False
+        return self.is_terminal(node)
+
+    def cross_check_mask(self, prefix: str, suffix: str) -> int:
+        """Computes which letters can fill the gap in `prefix + ? + suffix` (see `DAWG.cross_check_mask`)."""
+        edges = self._edges
+        node = self.root
+        for char in prefix.upper():
+            node = self.get_child(node, char)
+            if node is None:
+                return 0
+
+        suffix = suffix.upper()
+        mask = 0
+        index = edges[node] >> _CHILD_SHIFT
+        while index:
+            edge = edges[index]
+            bit = LETTER_BITS.get(chr(edge & _LETTER_MASK))
+            if bit is not None:
+                child = index
+                for suffix_char in suffix:
+                    child = self.get_child(child, suffix_char)
+                    if child is None:
+                        break
+                else:
+                    if edges[child] & _TERMINAL_BIT:
+                        mask |= bit
+            index = 0 if edge & _LAST_BIT else index + 1
+        return mask
+
+    def get_all_words(self) -> List[str]:
+        """Retrieve all words stored in the DAWG."""
+        words = []
+        stack = [(self.root, "")]
+        while stack:
+            node, current_word = stack.pop()
+            if self.is_terminal(node):
+                words.append(current_word)
+            stack.extend((child, current_word + char) for char, child in reversed(list(self.children(node))))
+        return words
+
+
+# Anything the cross-check code can query for word validity.
+Lexicon = Union[DAWG, FlatDAWG]
+
+
+def load_lexicon(path: str) -> Lexicon:
+    """
+    Load a lexicon file, memory-mapping it if it is in the flat format.
+
+    Args:
+        path (str): Path to a serialized DAWG (flat or node-based format).
+
+    Returns:
+        Lexicon: A `FlatDAWG` for flat files, otherwise a deserialized `DAWG`.
+    """
+    with open(path, "rb") as file:
+        magic = file.read(len(FLAT_DAWG_MAGIC))
+        if magic == FLAT_DAWG_MAGIC:
+            return FlatDAWG.load(path)
+        data = magic + file.read()
+
+    dawg = DAWG()
+    dawg.deserialize(data)
+    return dawg
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a minimized DAWG from a word list.")
+    parser.add_argument("word_list", help="Plain text word list, one word per line")
+    parser.add_argument("output", help="Where to write the serialized DAWG")
+    parser.add_argument("--flat", action="store_true", help="Write the flat, memory-mappable format")
+    args = parser.parse_args()
+
+    built = build_dawg_from_word_list(args.word_list)
+    with open(args.output, "wb") as out:
+        out.write(built.serialize_flat() if args.flat else built.serialize())
@@ -0,0 +1,146 @@
+from typing import Dict, List, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from game_logic.types import Board, PackedBoard, PackedCrossCheckBoard
+from game_logic.zobrist import zobrist_hash_batch
+
+# The 8 symmetries of the square (the premium layout is invariant under all of them)
+ALL_SYMMETRIES = [
+    "identity", "rotate_90", "rotate_180", "rotate_270", "flip_rows", "flip_columns", "transpose", "anti_transpose",
+]
+
+# Symmetries that keep words reading left to right and top to bottom. Only these
+# preserve cross-checks (with cs_h and cs_v swapped by the transpose); the others
+# reverse words, so lexicon-dependent features are not invariant under them.
+READING_SYMMETRIES = ["identity", "transpose"]
+
+_GRID = np.arange(225).reshape(15, 15)
+
+# Flat square permutations: transformed.flat[i] == board.flat[_PERMUTATIONS[name][i]]
+_PERMUTATIONS: Dict[str, np.ndarray] = {
+    "identity": _GRID.ravel(),
+    "rotate_90": np.rot90(_GRID, 1).ravel(),
+    "rotate_180": np.rot90(_GRID, 2).ravel(),
+    "rotate_270": np.rot90(_GRID, 3).ravel(),
+    "flip_rows": _GRID[::-1].ravel(),
+    "flip_columns": _GRID[:, ::-1].ravel(),
+    "transpose": _GRID.T.ravel(),
+    "anti_transpose": np.rot90(_GRID, 2).T.ravel(),
+}
+_PERMUTATION_LISTS: Dict[str, List[int]] = {name: permutation.tolist() for name, permutation in _PERMUTATIONS.items()}
+
+_INVERSES = {
+    name: next(other for other in ALL_SYMMETRIES if np.array_equal(permutation[_PERMUTATIONS[other]], _GRID.ravel()))
+    for name, permutation in _PERMUTATIONS.items()
+}
+
+AnyBoard = TypeVar("AnyBoard", Board, PackedBoard, np.ndarray)
+
+
+def inverse_symmetry(symmetry: str) -> str:
+    """The symmetry undoing `symmetry`."""
+    return _INVERSES[symmetry]
+
+
+def transform_board(board: AnyBoard, symmetry: str) -> AnyBoard:
+    """
+    Applies a symmetry of the square to a board.
+
+    Args:
+        board (AnyBoard): A Board, a PackedBoard or an array whose last two axes
+            are the 15x15 grid (e.g. (N, 15, 15) square codes).
+        symmetry (str): One of ALL_SYMMETRIES.
+
+    Returns:
+        AnyBoard: The transformed board, in the same representation.
+    """
+    if isinstance(board, np.ndarray):
+        flat = board.reshape(board.shape[:-2] + (225,))
+        return flat[..., _PERMUTATIONS[symmetry]].reshape(board.shape)
+
+    permutation = _PERMUTATION_LISTS[symmetry]
+    if isinstance(board, PackedBoard):
+        data = board.data
+        return PackedBoard(bytes(data[source] for source in permutation))
+
+    squares = [tile for row in board for tile in row]
+    return [[squares[permutation[row * 15 + col]] for col in range(15)] for row in range(15)]
+
+
+def canonicalize_batch(
+    boards: np.ndarray, symmetries: Sequence[str] = READING_SYMMETRIES
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Maps each board to its canonical orientation among `symmetries`: the
+    orientation with the smallest Zobrist hash. All orientations of a board get
+    the same canonical board.
+
+    Args:
+        boards (np.ndarray): (N, 15, 15) uint8 square codes.
+        symmetries (Sequence[str]): The group to canonicalize over; READING_SYMMETRIES
+            (default) for anything lexicon-dependent, ALL_SYMMETRIES for occupancy-only uses.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - (N, 15, 15) canonical boards.
+            - (N,) index into `symmetries` of the symmetry applied to each board.
+            - (N,) uint64 Zobrist hashes of the canonical boards.
+    """
+    boards = np.asarray(boards, dtype=np.uint8)
+    hashes = np.stack([zobrist_hash_batch(transform_board(boards, symmetry)) for symmetry in symmetries])
+    chosen = hashes.argmin(axis=0)
+
+    canonical = boards.copy()
+    for index, symmetry in enumerate(symmetries):
+        rows = chosen == index
+        if rows.any() and symmetry != "identity":
+            canonical[rows] = transform_board(boards[rows], symmetry)
+    return canonical, chosen, hashes[chosen, np.arange(len(boards))]
+
+
+def dedupe_boards(
+    boards: np.ndarray, symmetries: Sequence[str] = READING_SYMMETRIES
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Collapses boards that are equal up to `symmetries`, so expensive per-board
+    work (cross-checks) runs once per distinct canonical board.
+
+    Args:
+        boards (np.ndarray): (N, 15, 15) uint8 square codes.
+        symmetries (Sequence[str]): The group to canonicalize over.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - (U, 15, 15) distinct canonical boards.
+            - (N,) index of each board's canonical board.
+            - (N,) index into `symmetries` of the symmetry mapping each board to it.
+    """
+    canonical, chosen, _ = canonicalize_batch(boards, symmetries)
+    _, first, inverse = np.unique(canonical.reshape(len(canonical), 225), axis=0, return_index=True, return_inverse=True)
+    return canonical[first], inverse.reshape(-1), chosen
+
+
+def transform_cross_checks(
+    cs_h: PackedCrossCheckBoard, cs_v: PackedCrossCheckBoard, symmetry: str
+) -> Tuple[PackedCrossCheckBoard, PackedCrossCheckBoard]:
+    """
+    Cross-checks of the transformed board, from those of the original.
+
+    Args:
+        cs_h (PackedCrossCheckBoard): Horizontal cross-checks of the board.
+        cs_v (PackedCrossCheckBoard): Vertical cross-checks of the board.
+        symmetry (str): One of READING_SYMMETRIES.
+
+    Returns:
+        Tuple[PackedCrossCheckBoard, PackedCrossCheckBoard]: (cs_h, cs_v) of the transformed board.
+
+    Raises:
+        ValueError: For symmetries that reverse words, which change cross-checks.
+    """
+    if symmetry == "identity":
+        return cs_h, cs_v
+    if symmetry == "transpose":
+        return cs_v.transposed(), cs_h.transposed()
+    raise ValueError(f"{symmetry!r} reverses the reading direction of words; cross-checks do not carry over")
+
@@ -1,15 +1,252 @@
-from typing import List, Tuple, Optional, Dict
+from typing import List, Tuple, Optional, Dict, Iterable, Iterator, Sequence, Union
+
+import numpy as np
 
 # Board representation: each tile is a letter (A-Z for normal, a-z for blanks) or None
 Board = List[List[Optional[str]]]
 
+# Packed board encoding: one byte per square, row-major. 0 is an empty square,
+# 1-26 are tiles A-Z and blanks add BLANK_OFFSET, so code == ord(tile) - 64.
+BLANK_OFFSET = 32
+_CODE_TO_TILE: List[Optional[str]] = [None] * 256
+for _code in range(1, 27):
+    _CODE_TO_TILE[_code] = chr(64 + _code)
+    _CODE_TO_TILE[_code + BLANK_OFFSET] = chr(64 + BLANK_OFFSET + _code)
+
+class PackedBoard:
+    """
+    A board packed into 225 bytes (see BLANK_OFFSET for the encoding).
+
+    Immutable and hashable, so it can key caches and dicts. Indexing
+    `packed[row][col]` returns the same values as a Board (letter or None), so
+    existing feature code can take a PackedBoard unchanged; the decoded rows are
+    built on first use.
+    """
+    __slots__ = ("data", "_rows")
+
+    def __init__(self, data: bytes = bytes(225)):
+        if len(data) != 225:
+            raise ValueError(f"A packed board needs 225 bytes, got {len(data)}")
+        self.data = bytes(data)
+        self._rows = None
+
+    @classmethod
+    def from_board(cls, board: Board) -> "PackedBoard":
+        return cls(bytes(0 if tile is None else ord(tile) - 64 for row in board for tile in row))
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "PackedBoard":
+        return cls(np.ascontiguousarray(array, dtype=np.uint8).tobytes())
+
+    def to_board(self) -> Board:
+        return [[_CODE_TO_TILE[code] for code in self.data[row * 15:row * 15 + 15]] for row in range(15)]
+
+    def to_array(self) -> np.ndarray:
+        """Read-only (15, 15) uint8 view of the packed bytes."""
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(15, 15)
+
+    def __getitem__(self, row: int) -> List[Optional[str]]:
+        if self._rows is None:
+            self._rows = self.to_board()
+        return self._rows[row]
+
+    def __len__(self) -> int:
+        return 15
+
+    def __iter__(self) -> Iterator[List[Optional[str]]]:
+        return (self[row] for row in range(15))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedBoard):
+            return NotImplemented
+        return self.data == other.data
+
+    def __hash__(self) -> int:
+        return hash(self.data)
+
+    def __repr__(self) -> str:
+        return f"PackedBoard({self.data!r})"
+
+# Cross-check letter masks: bit i is set when chr(ord("A") + i) is playable
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+LETTER_BITS: Dict[str, int] = {letter: 1 << i for i, letter in enumerate(LETTERS)}
+ALL_LETTERS_MASK = (1 << len(LETTERS)) - 1
+
+def letters_to_mask(letters: Iterable[str]) -> int:
+    """Packs a collection of uppercase letters into a 26-bit mask."""
+    mask = 0
+    for letter in letters:
+        mask |= LETTER_BITS[letter]
+    return mask
+
+def mask_to_letters(mask: int) -> set:
+    """Unpacks a 26-bit letter mask into a set of uppercase letters."""
+    return {letter for letter, bit in LETTER_BITS.items() if mask & bit}
+
+def popcount(mask: int) -> int:
+    """Number of letters allowed by a letter mask."""
+    return bin(mask).count("1")
+
 # Define CrossCheck structure
 class CrossCheck:
     def __init__(self, valid_letters: set, partial_sum: int, is_open_square: bool):
-        self.valid_letters = valid_letters
+        self._valid_letters = valid_letters
+        self.letter_mask = letters_to_mask(valid_letters)
         self.partial_sum = partial_sum
         self.is_open_square = is_open_square
 
+    @classmethod
+    def from_mask(cls, letter_mask: int, partial_sum: int, is_open_square: bool) -> "CrossCheck":
+        """Builds a cross-check from a letter mask; the letter set is only materialized on access."""
+        cross_check = cls.__new__(cls)
+        cross_check._valid_letters = None
+        cross_check.letter_mask = letter_mask
+        cross_check.partial_sum = partial_sum
+        cross_check.is_open_square = is_open_square
+        return cross_check
+
+    @property
+    def valid_letters(self) -> set:
+        if self._valid_letters is None:
+            self._valid_letters = mask_to_letters(self.letter_mask)
+        return self._valid_letters
+
+    @valid_letters.setter
+    def valid_letters(self, letters: set) -> None:
+        self._valid_letters = letters
+        self.letter_mask = letters_to_mask(letters)
+
+    @property
+    def num_valid_letters(self) -> int:
+        return popcount(self.letter_mask)
+
 CrossCheckBoard = List[List[Optional[CrossCheck]]]
 # Open square cross-check (all letters valid)
-open_square_cross_check = CrossCheck(set("ABCDEFGHIJKLMNOPQRSTUVWXYZ"), 0, True)
\ No newline at end of file
+open_square_cross_check = CrossCheck(set(LETTERS), 0, True)
+
+# Per-square flags of a PackedCrossCheckBoard
+CROSS_CHECK_PRESENT = 1  # Square has a cross-check (it is an anchor)
+CROSS_CHECK_OPEN = 2     # The cross-check is the unconstrained open square
+
+class PackedCrossCheckBoard:
+    """
+    A cross-check board packed into three 15x15 arrays: uint32 letter masks,
+    int16 partial sums and uint8 flags (CROSS_CHECK_PRESENT / CROSS_CHECK_OPEN),
+    i.e. 7 bytes per square and 1575 bytes per board (3150 bytes for the cs_h,
+    cs_v pair of a position) whatever its number of anchors.
+
+    The arrays may carry a leading batch dimension (see `stack`). For a single
+    board, `packed[row][col]` returns a CrossCheck (or None), so code written
+    against CrossCheckBoard keeps working.
+    """
+    __slots__ = ("letter_masks", "partial_sums", "flags")
+
+    def __init__(
+        self,
+        letter_masks: Optional[np.ndarray] = None,
+        partial_sums: Optional[np.ndarray] = None,
+        flags: Optional[np.ndarray] = None,
+    ):
+        self.letter_masks = np.zeros((15, 15), dtype=np.uint32) if letter_masks is None else letter_masks
+        self.partial_sums = np.zeros((15, 15), dtype=np.int16) if partial_sums is None else partial_sums
+        self.flags = np.zeros((15, 15), dtype=np.uint8) if flags is None else flags
+
+    @classmethod
+    def from_cross_check_board(cls, cross_check_board: CrossCheckBoard) -> "PackedCrossCheckBoard":
+        packed = cls()
+        for row in range(15):
+            for col in range(15):
+                cross_check = cross_check_board[row][col]
+                if cross_check is not None:
+                    packed.set(row, col, cross_check.letter_mask, cross_check.partial_sum, cross_check.is_open_square)
+        return packed
+
+    @classmethod
+    def stack(cls, boards: Sequence["PackedCrossCheckBoard"]) -> "PackedCrossCheckBoard":
+        """Stacks single boards into one batch with arrays of shape (N, 15, 15)."""
+        return cls(
+            np.stack([board.letter_masks for board in boards]) if boards else np.zeros((0, 15, 15), dtype=np.uint32),
+            np.stack([board.partial_sums for board in boards]) if boards else np.zeros((0, 15, 15), dtype=np.int16),
+            np.stack([board.flags for board in boards]) if boards else np.zeros((0, 15, 15), dtype=np.uint8),
+        )
+
+    def set(self, row: int, col: int, letter_mask: int, partial_sum: int, is_open_square: bool) -> None:
+        self.letter_masks[row, col] = letter_mask
+        self.partial_sums[row, col] = partial_sum
+        self.flags[row, col] = CROSS_CHECK_PRESENT | (CROSS_CHECK_OPEN if is_open_square else 0)
+
+    def clear(self, row: int, col: int) -> None:
+        self.letter_masks[row, col] = 0
+        self.partial_sums[row, col] = 0
+        self.flags[row, col] = 0
+
+    def get(self, row: int, col: int) -> Optional[CrossCheck]:
+        """Returns a CrossCheck view of a single square (None if it has no cross-check)."""
+        flags = int(self.flags[row, col])
+        if not flags & CROSS_CHECK_PRESENT:
+            return None
+        if flags & CROSS_CHECK_OPEN:
+            return open_square_cross_check
+        return CrossCheck.from_mask(int(self.letter_masks[row, col]), int(self.partial_sums[row, col]), False)
+
+    def to_cross_check_board(self) -> CrossCheckBoard:
+        return [[self.get(row, col) for col in range(15)] for row in range(15)]
+
+    def transposed(self) -> "PackedCrossCheckBoard":
+        """Swaps rows and columns (the last two axes)."""
+        return PackedCrossCheckBoard(
+            np.ascontiguousarray(np.swapaxes(self.letter_masks, -1, -2)),
+            np.ascontiguousarray(np.swapaxes(self.partial_sums, -1, -2)),
+            np.ascontiguousarray(np.swapaxes(self.flags, -1, -2)),
+        )
+
+    def copy(self) -> "PackedCrossCheckBoard":
+        return PackedCrossCheckBoard(self.letter_masks.copy(), self.partial_sums.copy(), self.flags.copy())
+
+    @property
+    def nbytes(self) -> int:
+        return self.letter_masks.nbytes + self.partial_sums.nbytes + self.flags.nbytes
+
+    def __getitem__(self, row: int) -> List[Optional[CrossCheck]]:
+        return [self.get(row, col) for col in range(15)]
+
+    def __len__(self) -> int:
+        return len(self.flags)
+
+    def __iter__(self) -> Iterator[List[Optional[CrossCheck]]]:
+        return (self[row] for row in range(len(self)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedCrossCheckBoard):
+            return NotImplemented
+        return (
+            np.array_equal(self.letter_masks, other.letter_masks)
+            and np.array_equal(self.partial_sums, other.partial_sums)
+            and np.array_equal(self.flags, other.flags)
+        )
+
+    __hash__ = None
+
+# Either cross-check board representation
+AnyCrossCheckBoard = Union[CrossCheckBoard, PackedCrossCheckBoard]
+
+def as_packed(cross_check_board: AnyCrossCheckBoard) -> PackedCrossCheckBoard:
+    """Returns the packed form of a cross-check board, converting only if needed."""
+    if isinstance(cross_check_board, PackedCrossCheckBoard):
+        return cross_check_board
+    return PackedCrossCheckBoard.from_cross_check_board(cross_check_board)
+
+def cross_check_grids(cross_check_board: AnyCrossCheckBoard) -> Tuple[List[List[int]], List[List[int]]]:
+    """
+    Letter masks and flags of a single cross-check board as nested lists, which
+    are the cheapest form to index square by square in Python.
+    """
+    if isinstance(cross_check_board, PackedCrossCheckBoard):
+        return cross_check_board.letter_masks.tolist(), cross_check_board.flags.tolist()
+
+    masks = [[0 if cc is None else cc.letter_mask for cc in row] for row in cross_check_board]
+    flags = [
+        [0 if cc is None else CROSS_CHECK_PRESENT | (CROSS_CHECK_OPEN if cc.is_open_square else 0) for cc in row]
+        for row in cross_check_board
+    ]
+    return masks, flags
\ No newline at end of file
@@ -107,7 +107,7 @@ def pretty_print_board_with_crosschecks(board: Board, cross_check_board: CrossCh
             if tile is not None:  # Letter tile present
                 cell_str = tile  # Single letter
             elif cross_check is not None and not cross_check.is_open_square:  # Show valid letter count
-                cell_str = str(len(cross_check.valid_letters))  # Show count
+                cell_str = str(cross_check.num_valid_letters)  # Show count
             elif cross_check is not None and cross_check.is_open_square:
                 cell_str = "○"  # Open squares
             elif SPECIAL_TILES_LOCATIONS[row_idx][col_idx]:  # Special tile
@@ -0,0 +1,105 @@
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+
+from game_logic.types import Board, PackedBoard
+
+# One random non-zero 64-bit key per (square code, square), see PackedBoard for
+# the codes. Code 0 (empty) has all-zero keys, so a board's hash is the XOR of
+# the keys of its tiles. The seed is fixed: hashes are stable across processes
+# and runs.
+ZOBRIST_KEYS = np.random.default_rng(0x5CAB).integers(1, 2 ** 64, size=(256, 225), dtype=np.uint64)
+ZOBRIST_KEYS[0] = 0
+_KEYS: List[List[int]] = ZOBRIST_KEYS.tolist()
+# _KEYS of the mirrored square (col, row), to hash a board's transpose without building it
+_TRANSPOSED_KEYS: List[List[int]] = ZOBRIST_KEYS.reshape(256, 15, 15).transpose(0, 2, 1).reshape(256, 225).tolist()
+
+
+def zobrist_hash(board: Union[Board, PackedBoard]) -> int:
+    """
+    64-bit Zobrist hash of a board.
+
+    Equal boards always hash equally whatever their representation (list of
+    lists or PackedBoard); two different boards collide with probability about
+    2^-64.
+
+    Args:
+        board (Union[Board, PackedBoard]): The board.
+
+    Returns:
+        int: The hash, as a non-negative Python int.
+    """
+    result = 0
+    if isinstance(board, PackedBoard):
+        for square, code in enumerate(board.data):
+            if code:
+                result ^= _KEYS[code][square]
+        return result
+
+    square = 0
+    for row in board:
+        for tile in row:
+            if tile is not None:
+                result ^= _KEYS[ord(tile) - 64][square]
+            square += 1
+    return result
+
+
+def zobrist_hash_pair(board: Union[Board, PackedBoard]) -> Tuple[int, int]:
+    """
+    Zobrist hashes of a board and of its transpose, in one pass over the board.
+
+    Args:
+        board (Union[Board, PackedBoard]): The board.
+
+    Returns:
+        Tuple[int, int]: (zobrist_hash(board), zobrist_hash of the transposed board).
+    """
+    result = transposed = 0
+    if isinstance(board, PackedBoard):
+        for square, code in enumerate(board.data):
+            if code:
+                result ^= _KEYS[code][square]
+                transposed ^= _TRANSPOSED_KEYS[code][square]
+        return result, transposed
+
+    square = 0
+    for row in board:
+        for tile in row:
+            if tile is not None:
+                code = ord(tile) - 64
+                result ^= _KEYS[code][square]
+                transposed ^= _TRANSPOSED_KEYS[code][square]
+            square += 1
+    return result, transposed
+
+
+def zobrist_hash_batch(boards: np.ndarray) -> np.ndarray:
+    """
+    Zobrist hashes of a batch of packed boards.
+
+    Args:
+        boards (np.ndarray): (N, 15, 15) uint8 square codes (see parse_run_tile_batch).
+
+    Returns:
+        np.ndarray: (N,) uint64 hashes, equal to `zobrist_hash` of each board.
+    """
+    codes = np.asarray(boards, dtype=np.uint8).reshape(len(boards), 225)
+    return np.bitwise_xor.reduce(ZOBRIST_KEYS[codes, np.arange(225)], axis=1)
+
+
+def update_zobrist_hash(board_hash: int, placed_tiles: Iterable[Tuple[int, int, str]]) -> int:
+    """
+    Hash of a board after tiles were placed on empty squares (or removed from
+    them: XOR is its own inverse).
+
+    Args:
+        board_hash (int): Hash before the move.
+        placed_tiles (Iterable[Tuple[int, int, str]]): (row, col, tile) of each tile.
+
+    Returns:
+        int: Hash after the move.
+    """
+    for row, col, tile in placed_tiles:
+        board_hash ^= _KEYS[ord(tile) - 64][row * 15 + col]
+    return board_hash
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from typing import Any, Dict
+
+
+class AdmissionQueue:
+    """
+    Bounded admission for request handlers, per worker process.
+
+    Up to `max_running` requests run at once; up to `max_queued` more wait for
+    a slot, each for at most `timeout` seconds. `acquire` refuses a request
+    when the queue is already full or its wait times out, and the caller
+    answers it (503) right away instead of letting work pile up without bound.
+    """
+
+    def __init__(self, max_running: int, max_queued: int, timeout: float):
+        """
+        Args:
+            max_running (int): Requests admitted at once.
+            max_queued (int): Requests waiting for a slot at once.
+            timeout (float): Longest wait for a slot, in seconds.
+        """
+        if max_running <= 0:
+            raise ValueError(f"max_running must be positive, got {max_running}")
+        if max_queued < 0:
+            raise ValueError(f"max_queued must be non-negative, got {max_queued}")
+        self.max_running = max_running
+        self.max_queued = max_queued
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+        self._admitted = 0
+        self._queued = 0
+        self._rejected_full = 0
+        self._rejected_timeout = 0
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+
+    def acquire(self) -> bool:
+        """
+        Takes a slot, waiting in the queue if all are taken.
+
+        Returns:
+            bool: True if admitted (call `release` when done), False if the queue
+            was full or no slot freed up within `timeout`.
+        """
+        with self._condition:
+            if self._running < self.max_running:
+                self._running += 1
+                self._admitted += 1
+                return True
+            if self._waiting >= self.max_queued:
+                self._rejected_full += 1
+                return False
+
+            started = time.perf_counter()
+            self._waiting += 1
+            self._queued += 1
+            try:
+                admitted = self._condition.wait_for(lambda: self._running < self.max_running, self.timeout)
+            finally:
+                self._waiting -= 1
+            if not admitted:
+                self._rejected_timeout += 1
+                return False
+
+            waited = time.perf_counter() - started
+            self._running += 1
+            self._admitted += 1
+            self._total_wait += waited
+            self._max_wait_seen = max(self._max_wait_seen, waited)
+            return True
+
+    def release(self) -> None:
+        """Frees a slot taken by `acquire`, handing it to the longest waiting request."""
+        with self._condition:
+            self._running -= 1
+            self._condition.notify()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current occupancy, limits and admission counters since startup."""
+        with self._condition:
+            return {
+                "max_running": self.max_running,
+                "max_queued": self.max_queued,
+                "timeout_ms": 1000.0 * self.timeout,
+                "running": self._running,
+                "waiting": self._waiting,
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected_queue_full": self._rejected_full,
+                "rejected_timeout": self._rejected_timeout,
+                "mean_queue_wait_ms": 1000.0 * self._total_wait / self._queued if self._queued else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._max_wait_seen,
+            }
+
+
+def server_limits() -> Dict[str, Any]:
+    """
+    Per-worker sizing from the environment, shared by main.py and gunicorn.conf.py
+    so the defaults stay consistent:
+
+        BATCH_MAX_SIZE    rows per micro-batch (default 64)
+        MAX_IN_FLIGHT     prediction requests running at once (default BATCH_MAX_SIZE,
+                          so concurrent single-row requests can fill a batch)
+        MAX_QUEUED        further requests waiting for a slot (default BATCH_MAX_SIZE)
+        QUEUE_TIMEOUT_MS  longest wait for a slot before a 503 (default 1000)
+        WEB_THREADS       gunicorn threads per worker (default MAX_IN_FLIGHT + MAX_QUEUED
+                          + 2: every running or queued request holds a thread, and the
+                          spare ones answer the 503s)
+    """
+    batch_max_size = int(os.environ.get("BATCH_MAX_SIZE", 64))
+    max_in_flight = int(os.environ.get("MAX_IN_FLIGHT", batch_max_size))
+    max_queued = int(os.environ.get("MAX_QUEUED", batch_max_size))
+    return {
+        "batch_max_size": batch_max_size,
+        "max_in_flight": max_in_flight,
+        "max_queued": max_queued,
+        "queue_timeout": float(os.environ.get("QUEUE_TIMEOUT_MS", 1000.0)) / 1000.0,
+        "web_threads": int(os.environ.get("WEB_THREADS", max_in_flight + max_queued + 2)),
+    }
@@ -0,0 +1,211 @@
+import numbers
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class BatcherStopped(RuntimeError):
+    """Raised by `MicroBatcher.submit` once the batcher has been stopped."""
+
+
+class _PendingRow:
+    """One caller's feature vector, waiting for its score."""
+
+    __slots__ = ("features", "enqueued", "done", "score", "error")
+
+    def __init__(self, features: np.ndarray):
+        self.features = features
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.score: Optional[float] = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one model call.
+
+    Callers block in `submit`; a background thread takes the first waiting row,
+    keeps collecting rows until `max_batch_size` are waiting or `max_wait_ms`
+    have passed since that first row arrived, scores them with one call to
+    `predict_batch` and wakes every caller with its own score. A lone request
+    therefore waits at most `max_wait_ms` longer than it would unbatched.
+
+    The thread is started on the first `submit` (so a batcher created before a
+    fork runs in the child process that uses it) and `stop` lets it finish the
+    rows already queued. A stopped batcher stays stopped: later submissions
+    raise BatcherStopped.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        num_features: Optional[int] = None,
+    ):
+        """
+        Args:
+            predict_batch (Callable[[np.ndarray], np.ndarray]): Scores an (N, F)
+                float32 matrix, returning N scores.
+            max_batch_size (int): Most rows scored in one call.
+            max_wait_ms (float): Longest time the first row of a batch waits for
+                more rows.
+            num_features (Optional[int]): Expected row length F, checked in `submit`.
+        """
+        if max_batch_size <= 0:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        if max_wait_ms < 0:
+            raise ValueError(f"max_wait_ms must be non-negative, got {max_wait_ms}")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.num_features = num_features
+
+        self._queue: "queue.Queue[Optional[_PendingRow]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        # Guards _thread and _stopped, and orders enqueued rows before the stop sentinel
+        self._start_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._rows = 0
+        self._max_batch = 0
+        self._batch_size_counts: Dict[int, int] = {}
+        self._total_wait = 0.0
+        self._max_wait_seen = 0.0
+        self._total_predict = 0.0
+
+    def start(self) -> None:
+        """Starts the batching thread if it is not running in this process."""
+        with self._start_lock:
+            self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        # Called with _start_lock held
+        if self._stopped:
+            raise BatcherStopped("The batcher has been stopped")
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """
+        Scores the rows queued so far, then stops the batching thread.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the thread to finish.
+        """
+        with self._start_lock:
+            self._stopped = True
+            thread = self._thread
+            if thread is not None and thread.is_alive():
+                self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout)
+
+    def submit(self, features: Sequence[float]) -> float:
+        """
+        Scores one feature vector, batched with concurrent callers.
+
+        Args:
+            features (Sequence[float]): The feature vector; None or NaN marks a
+                missing value, as in the batch endpoints.
+
+        Returns:
+            float: The model's score for it.
+
+        Raises:
+            ValueError: If the row is not a vector of `num_features` numbers (or
+                None); raised to this caller only, before the row joins a batch.
+            BatcherStopped: If `stop` was called; the row was not scored.
+            Exception: Whatever `predict_batch` raised for the batch.
+        """
+        try:
+            row = np.asarray(features)
+        except ValueError as e:  # Ragged nested sequences
+            raise ValueError(f"Features must be a vector of numbers: {e}") from None
+        if row.ndim != 1 or (self.num_features is not None and row.shape[0] != self.num_features):
+            raise ValueError(f"Expected a vector of {self.num_features} features, got shape {row.shape}")
+        if row.dtype.kind not in "biuf" and not (
+            row.dtype == object and all(value is None or isinstance(value, numbers.Real) for value in row)
+        ):
+            raise ValueError("Features must be numbers (null or NaN for a missing value)")
+
+        pending = _PendingRow(row.astype(np.float32))
+        with self._start_lock:
+            self._ensure_thread()
+            self._queue.put(pending)
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.score
+
+    def _collect(self) -> Tuple[List[_PendingRow], bool]:
+        """The next batch, and whether `stop` was called while collecting it."""
+        first = self._queue.get()
+        if first is None:
+            return [], True
+        batch = [first]
+        deadline = first.enqueued + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                return batch, True
+            batch.append(pending)
+        return batch, False
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if not batch:
+                break
+            started = time.perf_counter()
+            try:
+                scores = self.predict_batch(np.stack([pending.features for pending in batch]))
+                for pending, score in zip(batch, scores):
+                    pending.score = float(score)
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finished = time.perf_counter()
+            for pending in batch:
+                pending.done.set()
+            self._record(batch, started, finished)
+
+    def _record(self, batch: List[_PendingRow], started: float, finished: float) -> None:
+        waits = [started - pending.enqueued for pending in batch]
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += len(batch)
+            self._max_batch = max(self._max_batch, len(batch))
+            self._batch_size_counts[len(batch)] = self._batch_size_counts.get(len(batch), 0) + 1
+            self._total_wait += sum(waits)
+            self._max_wait_seen = max(self._max_wait_seen, max(waits))
+            self._total_predict += finished - started
+
+    def stats(self) -> Dict[str, object]:
+        """Batch-size and queue-wait statistics since startup."""
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "batches": self._batches,
+                "rows": self._rows,
+                "queued": self._queue.qsize(),
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "largest_batch": self._max_batch,
+                "batch_size_counts": {str(size): count for size, count in sorted(self._batch_size_counts.items())},
+                "mean_queue_wait_ms": 1000.0 * self._total_wait / self._rows if self._rows else 0.0,
+                "max_queue_wait_ms": 1000.0 * self._max_wait_seen,
+                "mean_predict_ms": 1000.0 * self._total_predict / self._batches if self._batches else 0.0,
+            }
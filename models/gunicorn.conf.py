@@ -0,0 +1,38 @@
+# Production server settings: gunicorn -c gunicorn.conf.py main:app
+import multiprocessing
+import os
+
+from admission import server_limits
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+
+# One process per core by default; threads let the micro-batcher coalesce
+# concurrent requests within a worker. By default there is a thread for each of
+# the MAX_IN_FLIGHT running and MAX_QUEUED waiting requests (see main.py), plus
+# spares that answer 503 once that queue is full
+workers = int(os.environ.get("WEB_WORKERS", multiprocessing.cpu_count()))
+threads = server_limits()["web_threads"]
+
+# Bounded queues: connections a worker holds beyond its busy threads, and
+# connections waiting to be accepted. Both scale with the threads, so a burst
+# the admission queue would take is not reset at the socket first
+worker_connections = int(os.environ.get("WORKER_CONNECTIONS", 2 * threads))
+backlog = int(os.environ.get("BACKLOG", 2 * threads))
+
+# Load the model (and DAWG) once in the master so workers share its pages;
+# nothing is predicted before the fork (see post_fork)
+preload_app = True
+
+# Seconds a worker may take to finish in-flight requests on SIGTERM / restart
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 60))
+
+
+def post_fork(server, worker):
+    import main
+    main.configure_worker(server.cfg.workers)
+
+
+def worker_exit(server, worker):
+    import main
+    main.shutdown_worker()
@@ -1,14 +1,25 @@
-from flask import Flask, request, jsonify
+import os
+import struct
+import time
+
+from flask import Flask, Response, g, request, jsonify
+import numpy as np
 import xgboost as xgb
 import pandas as pd
 
-app = Flask(__name__)
+from features.board_parsing import parse_run_tile_packed
+from features.position_cache import PositionCache
+from features.registry import (
+    LexiconRequired, Position, extract_features, features_for_columns, required_intermediates,
+)
+from game_logic.dawg import load_lexicon
+from admission import AdmissionQueue, server_limits
+from batcher import BatcherStopped
+from model_registry import ModelRegistry
 
-# Load the model when the app starts
-model = xgb.Booster()
-model.load_model("xgboost_v0.json")
+app = Flask(__name__)
 
-# Define the feature names expected by the model
+# Define the feature names expected by the v0 model (its file does not store them)
 FEATURE_NAMES = [
     'score_diff', 'total_unseen_tiles',
     'leave_A', 'leave_B', 'leave_C', 'leave_D', 'leave_E', 'leave_F',
@@ -23,6 +34,161 @@ FEATURE_NAMES = [
     'unseen_X', 'unseen_Y', 'unseen_Z', 'unseen_?'
 ]
 
+# Lexicon for server-side features that need cross-checks, loaded once (optional:
+# the v0 FEATURE_NAMES do not need one)
+dawg = load_lexicon(os.environ["DAWG_PATH"]) if os.environ.get("DAWG_PATH") else None
+
+def check_position_features(model):
+    """
+    Rejects (ValueError) a model whose features /position would extract with
+    cross-checks when no lexicon is loaded, so a missing DAWG_PATH fails at
+    startup or reload rather than on requests.
+    """
+    try:
+        needs_lexicon = "dawg" in required_intermediates(model.feature_names)
+    except KeyError:
+        return  # Not servable from positions at all; /position says so
+    if needs_lexicon and dawg is None:
+        raise ValueError(f"Model {model.name} needs cross-check features for /position; set DAWG_PATH")
+
+# Worker sizing (BATCH_MAX_SIZE, MAX_IN_FLIGHT, MAX_QUEUED...), see admission.server_limits
+LIMITS = server_limits()
+
+# Concurrent single-row requests are scored together, per model version: a batch
+# closes once BATCH_MAX_SIZE rows are waiting or BATCH_MAX_WAIT_MS after its first row
+models = ModelRegistry(batcher_options={
+    "max_batch_size": LIMITS["batch_max_size"],
+    "max_wait_ms": float(os.environ.get("BATCH_MAX_WAIT_MS", 2.0)),
+}, validate=check_position_features)
+
+# Load the models when the app starts: the versions listed in MODEL_MANIFEST
+# (see ModelRegistry), or v0 alone. They are warmed up per process by
+# configure_worker, never in the gunicorn master: predicting before the fork
+# would start OpenMP thread pools that the forked workers cannot use
+MODEL_MANIFEST = os.environ.get("MODEL_MANIFEST")
+if MODEL_MANIFEST:
+    models.load_manifest(MODEL_MANIFEST, warm_up=False)
+else:
+    models.load("v0", "xgboost_v0.json", feature_names=FEATURE_NAMES, make_default=True, warm_up=False)
+
+def requested_model(data=None):
+    """
+    The model version a request asks for through the X-Model-Version header, the
+    `version` query argument or the `version` field of its JSON body; the default
+    version otherwise. Returns (model, None), or (None, error response).
+    """
+    version = request.headers.get("X-Model-Version") or request.args.get("version")
+    if not version and isinstance(data, dict):
+        version = data.get("version")
+    g.requested_version = version
+    try:
+        return models.get(version), None
+    except KeyError as e:
+        return None, (jsonify({"error": e.args[0]}), 404)
+
+def submit_row(model, features):
+    """
+    Scores one row through `model`'s batcher. A row that lost the race with a
+    hot reload (its version's batcher was stopped after the request resolved it)
+    goes to the version now serving the request, if it takes the same features.
+    Returns (model used, score); raises BatcherStopped if the row cannot be moved.
+    """
+    try:
+        return model, model.batcher.submit(features)
+    except BatcherStopped:
+        try:
+            current = models.get(g.requested_version)
+        except KeyError:
+            raise BatcherStopped(f"Model version {model.name!r} was unloaded during the request") from None
+        if current.feature_names != model.feature_names:
+            raise BatcherStopped(f"Model version {model.name!r} changed its features during the request") from None
+        return current, current.batcher.submit(features)
+
+def model_changed_response(error):
+    response = jsonify({"error": f"{error}, retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+# Board-only work (cross-checks...) shared by positions on the same board
+position_cache = PositionCache(maxsize=int(os.environ.get("POSITION_CACHE_SIZE", 4096)))
+
+def parse_position(position):
+    """
+    Builds a registry Position from a request item: either a magpie-style line
+    ("<run-tile board> <rack> <opp score>/<player score> ...") or an object with
+    "board", "rack" and "scores" ("opp/player" or [opp, player]).
+
+    Raises:
+        ValueError: If the position, its board included, is malformed.
+    """
+    if isinstance(position, str):
+        fields = position.split()
+        if len(fields) < 3:
+            raise ValueError("Expected '<board> <rack> <opp score>/<player score>'")
+        board_rep, rack, scores = fields[:3]
+    elif isinstance(position, dict):
+        missing = [key for key in ("board", "rack", "scores") if key not in position]
+        if missing:
+            raise ValueError(f"Missing fields: {missing}")
+        board_rep, rack, scores = position["board"], position["rack"], position["scores"]
+    else:
+        raise ValueError("Expected a position line or object")
+
+    if not isinstance(board_rep, str) or not isinstance(rack, str):
+        raise ValueError("Expected the board and rack as strings")
+    board = parse_run_tile_packed(board_rep).to_board()
+
+    if isinstance(scores, str):
+        scores = scores.split("/")
+    try:
+        scores = [int(score) for score in scores]
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid scores {scores!r}") from None
+    if len(scores) != 2:
+        raise ValueError("Expected two scores (opponent, player)")
+    return Position(dawg, position_cache, board_rep=board_rep, board=board, rack=rack, scores=scores)
+
+# Back-pressure: each worker process runs up to MAX_IN_FLIGHT prediction requests
+# at once (by default a full micro-batch of single rows) and queues up to MAX_QUEUED
+# more for at most QUEUE_TIMEOUT_MS. Only a request finding the queue full, or not
+# admitted in time, gets a 503. gunicorn.conf.py gives each worker a thread for
+# every running and queued request, plus spares that answer the 503s
+admission = AdmissionQueue(LIMITS["max_in_flight"], LIMITS["max_queued"], LIMITS["queue_timeout"])
+UNLIMITED_ENDPOINTS = {"stats"}
+
+@app.before_request
+def acquire_request_slot():
+    if request.endpoint in UNLIMITED_ENDPOINTS:
+        return None
+    if not admission.acquire():
+        response = jsonify({"error": "Server saturated (request queue full), retry later"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    g.holds_request_slot = True
+    return None
+
+@app.teardown_request
+def release_request_slot(exc):
+    if g.pop("holds_request_slot", False):
+        admission.release()
+
+def configure_worker(workers=1):
+    """
+    Per-process setup, run in each worker after the fork (see gunicorn.conf.py):
+    splits the cores between workers for XGBoost, warms up the models and polls
+    the model manifest. The models and lexicon are loaded before the fork and
+    shared copy-on-write; batching threads start on first use.
+    """
+    nthread = int(os.environ.get("XGB_NTHREAD", 0)) or max(1, (os.cpu_count() or 1) // workers)
+    models.set_nthread(nthread)
+    models.warm_up()
+    if MODEL_MANIFEST:
+        models.watch_manifest(MODEL_MANIFEST, interval=float(os.environ.get("MODEL_MANIFEST_POLL_SECONDS", 5.0)))
+
+def shutdown_worker():
+    """Stops polling the manifest, scores the rows still queued and stops the batching threads."""
+    models.shutdown()
+
 @app.route("/", methods=["POST"])
 def predict():
     # Parse the incoming JSON request
@@ -31,17 +197,27 @@ def predict():
     
     if not features:
         return jsonify({"error": "No features provided"}), 400
+
+    if not isinstance(features, list):
+        return jsonify({"error": "Features should be a list of numbers (null for a missing value)"}), 400
+
+    model, error = requested_model(data)
+    if error:
+        return error
     
     # Validate the feature vector length
-    if len(features) != len(FEATURE_NAMES):
-        return jsonify({"error": f"Expected {len(FEATURE_NAMES)} features, but got {len(features)}"}), 400
+    if len(features) != len(model.feature_names):
+        return jsonify({"error": f"Expected {len(model.feature_names)} features, but got {len(features)}"}), 400
     
-    # Create a DataFrame for prediction
+    # Score together with concurrent requests
     try:
-        features_df = pd.DataFrame([features], columns=FEATURE_NAMES)
-        dmatrix = xgb.DMatrix(features_df)
-        prediction = model.predict(dmatrix)
-        return jsonify({"score": float(prediction[0])})
+        model, score = submit_row(model, features)
+        return jsonify({"score": score, "version": model.name})
+    except BatcherStopped as e:
+        return model_changed_response(e)
+    except ValueError as e:
+        # Rejected before joining a batch: only this request fails
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -57,30 +233,151 @@ def batch_predict():
     if not isinstance(batch_features, list):
         return jsonify({"error": "Batch features should be a list of feature vectors"}), 400
 
+    model, error = requested_model(data)
+    if error:
+        return error
+
     # Validate feature vectors
     invalid_indices = [
         idx for idx, features in enumerate(batch_features)
-        if len(features) != len(FEATURE_NAMES)
+        if len(features) != len(model.feature_names)
     ]
 
     if invalid_indices:
         return jsonify({
-            "error": f"Invalid feature vector lengths at indices: {invalid_indices}. Expected {len(FEATURE_NAMES)} features."
+            "error": f"Invalid feature vector lengths at indices: {invalid_indices}. Expected {len(model.feature_names)} features."
         }), 400
 
     try:
-        # Create a DataFrame for batch prediction
-        features_df = pd.DataFrame(batch_features, columns=FEATURE_NAMES)
+        # Create a DataFrame for batch prediction (null becomes NaN: a missing value)
+        features_df = pd.DataFrame(batch_features, columns=model.feature_names, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Features must be numbers (null for a missing value): {e}"}), 400
+
+    try:
         dmatrix = xgb.DMatrix(features_df)
-        predictions = model.predict(dmatrix)
+        predictions = model.booster.predict(dmatrix)
 
         # Return predictions as a list
-        return jsonify({"scores": predictions.tolist()})
+        return jsonify({"scores": predictions.tolist(), "version": model.name})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+# Binary batch format: a little-endian uint32 row count and uint32 column count,
+# followed by the row-major little-endian float32 matrix
+BINARY_HEADER = struct.Struct("<II")
+
+@app.route("/batch/binary", methods=["POST"])
+def batch_predict_binary():
+    # Read the raw body without decoding it
+    body = request.get_data(cache=False)
+    if len(body) < BINARY_HEADER.size:
+        return jsonify({"error": f"Expected a {BINARY_HEADER.size}-byte header (rows, cols as uint32)"}), 400
+
+    model, error = requested_model()
+    if error:
+        return error
+
+    rows, cols = BINARY_HEADER.unpack_from(body)
+    if cols != len(model.feature_names):
+        return jsonify({"error": f"Expected {len(model.feature_names)} features, but got {cols}"}), 400
+    if rows == 0:
+        return jsonify({"error": "No batch features provided"}), 400
+
+    expected_size = BINARY_HEADER.size + 4 * rows * cols
+    if len(body) != expected_size:
+        return jsonify({"error": f"Expected {expected_size} bytes for {rows}x{cols} float32, but got {len(body)}"}), 400
+
+    try:
+        # Predict straight from a view of the request body
+        features = np.frombuffer(body, dtype="<f4", offset=BINARY_HEADER.size).reshape(rows, cols)
+        predictions = model.predict(features)
+
+        # Return predictions as little-endian float32
+        return Response(
+            predictions.astype("<f4").tobytes(), mimetype="application/octet-stream",
+            headers={"X-Model-Version": model.name},
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/position", methods=["POST"])
+def predict_position():
+    # Parse the incoming JSON request: one position or a batch of them
+    started = time.perf_counter()
+    data = request.json
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with 'position' or 'positions'"}), 400
+    single = "position" in data
+    positions = [data["position"]] if single else data.get("positions")
+
+    if not positions:
+        return jsonify({"error": "No positions provided"}), 400
+
+    if not isinstance(positions, list):
+        return jsonify({"error": "Positions should be a list of positions"}), 400
+
+    model, error = requested_model(data)
+    if error:
+        return error
+    try:
+        features_for_columns(model.feature_names)
+    except KeyError as e:
+        return jsonify({"error": f"Model {model.name} cannot be scored from positions: {e.args[0]}"}), 400
+
+    # Decode the positions, rejecting malformed boards
+    parsed = []
+    for idx, position in enumerate(positions):
+        try:
+            parsed.append(parse_position(position))
+        except ValueError as e:
+            return jsonify({"error": f"Invalid position at index {idx}: {e}"}), 400
+    decoded = time.perf_counter()
+
+    # Extract the model's features server-side
+    features = np.empty((len(parsed), len(model.feature_names)), dtype=np.float32)
+    for idx, position in enumerate(parsed):
+        try:
+            values = extract_features(position, model.feature_names)
+        except LexiconRequired as e:
+            # A server configuration problem, not a bad request (see check_position_features)
+            return jsonify({"error": f"Model {model.name} cannot be scored from positions here: {e}"}), 500
+        except (KeyError, ValueError, IndexError, TypeError) as e:
+            return jsonify({"error": f"Invalid position at index {idx}: {e}"}), 400
+        features[idx] = [values[name] for name in model.feature_names]
+    extracted = time.perf_counter()
+
+    try:
+        if single:
+            model, score = submit_row(model, features[0])
+            result = {"score": score}
+        else:
+            result = {"scores": model.predict(features).tolist()}
+    except BatcherStopped as e:
+        return model_changed_response(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    predicted = time.perf_counter()
+
+    result["version"] = model.name
+    result["timing_ms"] = {
+        "decode": 1000.0 * (decoded - started),
+        "features": 1000.0 * (extracted - decoded),
+        "predict": 1000.0 * (predicted - extracted),
+        "total": 1000.0 * (predicted - started),
+    }
+    return jsonify(result)
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    # Loaded model versions with the batch-size and queue-wait statistics of
+    # their single-prediction batchers, request admission, hit rate of the position cache
+    return jsonify({
+        "models": models.stats(), "admission": admission.stats(), "position_cache": position_cache.stats(),
+    })
+
 if __name__ == "__main__":
-    import os
     port = int(os.environ.get("PORT", 8080))
+    configure_worker()
     app.run(host="0.0.0.0", port=port)
 
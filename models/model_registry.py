@@ -0,0 +1,230 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+
+from batcher import MicroBatcher
+
+
+class ModelVersion:
+    """One loaded model, its feature order and the batcher for its single-row requests."""
+
+    def __init__(self, name: str, path: str, booster: xgb.Booster, feature_names: List[str], batcher_options: Dict[str, Any]):
+        self.name = name
+        self.path = path
+        self.mtime = os.path.getmtime(path)
+        self.booster = booster
+        self.feature_names = list(feature_names)
+        self.loaded_at = time.time()
+        self.batcher = MicroBatcher(self.predict, num_features=len(self.feature_names), **batcher_options)
+
+    def predict(self, rows: np.ndarray) -> np.ndarray:
+        """Scores an (N, len(feature_names)) float32 matrix with one model call."""
+        return self.booster.predict(xgb.DMatrix(rows, feature_names=self.feature_names))
+
+    def describe(self) -> Dict[str, Any]:
+        return {"path": self.path, "num_features": len(self.feature_names), "loaded_at": self.loaded_at}
+
+
+class ModelRegistry:
+    """
+    Model versions loaded side by side, with an atomically swappable default.
+
+    Requests resolve a version once (`get`) and use that object throughout, so
+    a concurrent swap never mixes two models within a request. A new or
+    reloaded version is warmed up with a canned batch before it is published.
+
+    The set of versions can be driven by a JSON manifest, polled by each worker
+    process (`watch_manifest`):
+
+        {"default": "v1",
+         "versions": {"v0": {"path": "xgboost_v0.json", "feature_names": [...]},
+                      "v1": {"path": "xgboost_v1.json"}}}
+
+    "feature_names" may be omitted when the model file stores them. Relative
+    paths are relative to the manifest.
+
+    `validate`, if given, is called with each new version before it is warmed
+    up or published and rejects it by raising ValueError (e.g. a model whose
+    features this server cannot compute).
+    """
+
+    def __init__(
+        self,
+        batcher_options: Optional[Dict[str, Any]] = None,
+        warmup_rows: int = 64,
+        validate: Optional[Callable[[ModelVersion], None]] = None,
+    ):
+        self.batcher_options = dict(batcher_options or {})
+        self.warmup_rows = warmup_rows
+        self.validate = validate
+        self.nthread: Optional[int] = None
+        # (versions, default) replaced as a whole, so readers see a consistent pair
+        self._state: Tuple[Dict[str, ModelVersion], Optional[str]] = ({}, None)
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    def get(self, version: Optional[str] = None) -> ModelVersion:
+        """
+        The requested version, or the default one.
+
+        Raises:
+            KeyError: If the version is not loaded (or no default is set).
+        """
+        versions, default = self._state
+        name = version or default
+        if name not in versions:
+            raise KeyError(f"Unknown model version {name!r}; loaded versions: {sorted(versions)}")
+        return versions[name]
+
+    @property
+    def default(self) -> Optional[str]:
+        return self._state[1]
+
+    def load(
+        self, name: str, path: str, feature_names: Optional[List[str]] = None, make_default: bool = False,
+        warm_up: bool = True,
+    ) -> ModelVersion:
+        """
+        Loads (or replaces) a version, warms it up and publishes it.
+
+        Args:
+            name (str): Version name, e.g. "v1".
+            path (str): XGBoost model file.
+            feature_names (Optional[List[str]]): Feature order; defaults to the names stored in the model.
+            make_default (bool): Also make it the default version.
+            warm_up (bool): Score the canned batch before publishing. Pass False in
+                a process that forks afterwards, and call `warm_up` in each child.
+
+        Returns:
+            ModelVersion: The published version.
+
+        Raises:
+            ValueError: If the feature names are unknown, `validate` rejects the
+                model or the warm-up batch fails.
+        """
+        booster = xgb.Booster()
+        booster.load_model(path)
+        feature_names = feature_names or booster.feature_names
+        if not feature_names:
+            raise ValueError(f"{path} stores no feature names; list them in the manifest")
+        if self.nthread:
+            booster.set_param({"nthread": self.nthread})
+
+        model = ModelVersion(name, path, booster, feature_names, self.batcher_options)
+        if self.validate is not None:
+            self.validate(model)
+        if warm_up:
+            self._warm_up(model)
+
+        with self._lock:
+            versions, default = self._state
+            previous = versions.get(name)
+            self._state = ({**versions, name: model}, name if make_default or default is None else default)
+        if previous is not None:
+            previous.batcher.stop(timeout=5.0)
+        return model
+
+    def unload(self, name: str) -> None:
+        """Removes a version other than the default."""
+        with self._lock:
+            versions, default = self._state
+            if name == default:
+                raise ValueError(f"Cannot unload the default version {name!r}")
+            model = versions.get(name)
+            self._state = ({key: value for key, value in versions.items() if key != name}, default)
+        if model is not None:
+            model.batcher.stop(timeout=5.0)
+
+    def set_default(self, name: str) -> None:
+        """Atomically routes requests without a version to `name`."""
+        with self._lock:
+            versions, _ = self._state
+            if name not in versions:
+                raise KeyError(f"Unknown model version {name!r}")
+            self._state = (versions, name)
+
+    def set_nthread(self, nthread: int) -> None:
+        """XGBoost threads per prediction, for loaded and future versions."""
+        self.nthread = nthread
+        for model in self._state[0].values():
+            model.booster.set_param({"nthread": nthread})
+
+    def load_manifest(self, manifest_path: str, warm_up: bool = True) -> None:
+        """
+        Brings the loaded versions in line with a manifest: loads new versions and
+        versions whose file changed, switches the default, then unloads versions
+        no longer listed. `warm_up` is passed on to `load`.
+        """
+        with open(manifest_path) as file:
+            manifest = json.load(file)
+        base_dir = os.path.dirname(os.path.abspath(manifest_path))
+        entries = manifest["versions"]
+        default = manifest.get("default")
+        if default not in entries:
+            raise ValueError(f"Manifest default {default!r} is not among its versions {sorted(entries)}")
+
+        for name, entry in entries.items():
+            path = os.path.join(base_dir, entry["path"])
+            current = self._state[0].get(name)
+            feature_names = entry.get("feature_names")
+            if (
+                current is None or current.path != path or current.mtime != os.path.getmtime(path)
+                or (feature_names and feature_names != current.feature_names)
+            ):
+                self.load(name, path, feature_names, warm_up=warm_up)
+                print(f"Loaded model {name} from {path}")
+
+        if default != self.default:
+            self.set_default(default)
+            print(f"Default model is now {default}")
+        for name in set(self._state[0]) - set(entries):
+            self.unload(name)
+            print(f"Unloaded model {name}")
+
+    def warm_up(self) -> None:
+        """Scores the canned batch with every loaded version (e.g. in each worker after a fork)."""
+        for model in self._state[0].values():
+            self._warm_up(model)
+
+    def watch_manifest(self, manifest_path: str, interval: float = 5.0) -> None:
+        """Re-applies the manifest whenever it changes, from a background thread of this process."""
+        def watch() -> None:
+            last_mtime = os.path.getmtime(manifest_path)
+            while not self._stop_watching.wait(interval):
+                try:
+                    mtime = os.path.getmtime(manifest_path)
+                    if mtime != last_mtime:
+                        self.load_manifest(manifest_path)
+                        last_mtime = mtime
+                except Exception as e:
+                    # Keep serving the current versions; retried on the next poll
+                    print(f"Failed to apply model manifest {manifest_path}: {e}")
+
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=watch, name="model-manifest-watcher", daemon=True)
+        self._watcher.start()
+
+    def shutdown(self) -> None:
+        """Stops the manifest watcher and the batchers (scoring the rows still queued)."""
+        self._stop_watching.set()
+        for model in self._state[0].values():
+            model.batcher.stop(timeout=5.0)
+
+    def stats(self) -> Dict[str, Any]:
+        versions, default = self._state
+        return {
+            "default": default,
+            "versions": {name: {**model.describe(), "batcher": model.batcher.stats()} for name, model in versions.items()},
+        }
+
+    def _warm_up(self, model: ModelVersion) -> None:
+        rows = np.zeros((self.warmup_rows, len(model.feature_names)), dtype=np.float32)
+        scores = model.predict(rows)
+        if scores.shape[0] != self.warmup_rows or not np.all(np.isfinite(scores)):
+            raise ValueError(f"Model {model.name} failed its warm-up batch")
@@ -0,0 +1,20 @@
+import pytest
+
+from game_logic.dawg import DAWG
+
+# Two- and three-letter words, so that random boards get non-trivial cross-checks
+WORDS = """
+AA AB AD AE AG AH AI AL AM AN AR AS AT AW AX AY BA BE BI BO BY DA DE DO ED EF EH EL EM EN ER ES EX
+FA FE GO HA HE HI HM HO ID IF IN IS IT JO KA KI LA LI LO MA ME MI MO MU MY NA NE NO NU OD OE OF OH
+OI OM ON OP OR OS OW OX OY PA PE PI QI RE SH SI SO TA TI TO UH UM UN UP US UT WE WO XI XU YA YE YO ZA
+ART ATE EAR EAT ERA ION IRE NET NIT NOR NOT OAR ONE ORE RAN RAT SAT SEA SET SIN SIR SIT SON TAN TEA TEN
+TIE TIN TOE TON TOR
+""".split()
+
+
+@pytest.fixture(scope="session")
+def dawg():
+    lexicon = DAWG()
+    for word in WORDS:
+        lexicon.insert(word)
+    return lexicon
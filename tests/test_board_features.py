@@ -0,0 +1,120 @@
+import random
+
+import numpy as np
+import pytest
+
+from features.bingo_lanes import compute_7_letter_bingo_lanes, compute_8_letter_bingo_lanes
+from features.board_features import extract_board_features
+from features.board_parsing import to_run_tile_representation
+from features.quadrant_features import count_tiles_in_quadrants
+from features.registry import Position, extract_feature_batch, extract_features
+from features.special_squares import (
+    compute_accessible_special_connections, compute_accessible_special_connections_batch,
+    compute_accessible_special_tiles, compute_accessible_special_tiles_batch,
+)
+from game_logic.crosschecks import find_cross_checks_both
+from game_logic.types import PackedBoard, PackedCrossCheckBoard
+
+LETTERS = "AAEEIIOONRSTLDUGMHXZQ"
+
+
+def _random_board(rng):
+    board = [[None] * 15 for _ in range(15)]
+    if rng.random() < 0.1:
+        return board
+    fill = rng.random() * 0.5
+    for row in range(15):
+        for col in range(15):
+            if rng.random() < fill:
+                tile = rng.choice(LETTERS)
+                board[row][col] = tile.lower() if rng.random() < 0.05 else tile
+    if rng.random() < 0.9:
+        board[7][7] = board[7][7] or "E"
+    return board
+
+
+def _random_cross_checks(rng):
+    """Cross-checks unrelated to any board, to reach combinations a lexicon rarely produces."""
+    cross_checks = PackedCrossCheckBoard()
+    for row in range(15):
+        for col in range(15):
+            if rng.random() < 0.3:
+                letter_mask = rng.choice([0, 0, 1, rng.getrandbits(26)])
+                cross_checks.set(row, col, letter_mask, 0, rng.random() < 0.1)
+    return cross_checks
+
+
+def _reference(board, special_pair, lane_pair):
+    lanes_7 = compute_7_letter_bingo_lanes(board, *lane_pair)
+    lanes_8 = compute_8_letter_bingo_lanes(board, *lane_pair)
+    return {
+        "quadrant_counts": count_tiles_in_quadrants(board),
+        "7_letter_bingo_lanes_list": lanes_7,
+        "7_letter_bingos": sum(lane[3] for lane in lanes_7),
+        "8_letter_bingo_lanes_list": lanes_8,
+        "8_letter_bingos": sum(lane[3] for lane in lanes_8),
+        "accessible_special_tiles": compute_accessible_special_tiles(board, *special_pair),
+        "accessible_special_connections": compute_accessible_special_connections(board, *special_pair),
+    }
+
+
+def test_extract_board_features_matches_reference_functions(dawg):
+    """One scan gives what the per-feature functions give, in both argument orders."""
+    rng = random.Random(15)
+    for _ in range(300):
+        board = _random_board(rng)
+        cs_h, cs_v = find_cross_checks_both(board, dawg, packed=True)
+        random_pair = (_random_cross_checks(rng), _random_cross_checks(rng))
+        for tiles in (board, PackedBoard.from_board(board)):
+            for special_pair, lane_pair in [
+                ((cs_h, cs_v), (cs_h, cs_v)),
+                ((cs_h, cs_v), (cs_v, cs_h)),  # The pipeline's orders
+                ((cs_h.to_cross_check_board(), cs_v.to_cross_check_board()), (cs_v, cs_h)),
+                (random_pair, random_pair[::-1]),
+                (random_pair, (cs_h, cs_v)),
+            ]:
+                expected = _reference(tiles, special_pair, lane_pair)
+                assert extract_board_features(tiles, *special_pair, lane_cross_checks=lane_pair) == expected
+                if lane_pair == special_pair:  # The default lane_cross_checks
+                    assert extract_board_features(tiles, *special_pair) == expected
+
+
+@pytest.mark.parametrize("random_cross_checks", [False, True])
+def test_special_square_batches_match_reference_functions(dawg, random_cross_checks):
+    """The NumPy batch kernels agree with the loop implementations board by board."""
+    rng = random.Random(17)
+    boards = [_random_board(rng) for _ in range(300)]
+    if random_cross_checks:
+        cross_checks = [(_random_cross_checks(rng), _random_cross_checks(rng)) for _ in boards]
+    else:
+        cross_checks = [find_cross_checks_both(board, dawg, packed=True) for board in boards]
+    stacked_h = PackedCrossCheckBoard.stack([cs_h for cs_h, _ in cross_checks])
+    stacked_v = PackedCrossCheckBoard.stack([cs_v for _, cs_v in cross_checks])
+    codes = np.stack([PackedBoard.from_board(board).to_array() for board in boards])
+
+    for occupied in (codes != 0, codes):
+        tiles = compute_accessible_special_tiles_batch(occupied, stacked_h, stacked_v)
+        connections = compute_accessible_special_connections_batch(occupied, stacked_h, stacked_v)
+        for i, (board, (cs_h, cs_v)) in enumerate(zip(boards, cross_checks)):
+            assert tuple(tiles[i]) == compute_accessible_special_tiles(board, cs_h, cs_v)
+            expected = compute_accessible_special_connections(board, cs_h, cs_v)
+            assert {special_type: counts[i] for special_type, counts in connections.items()} == expected
+
+
+def test_feature_batch_matches_single_positions(dawg):
+    """extract_feature_batch (batch kernels) and extract_features (one scan) give the same columns."""
+    rng = random.Random(19)
+    lines = [
+        f"{to_run_tile_representation(_random_board(rng))} AEINRST/ 100/120 0,0.5,3.0" for _ in range(100)
+    ]
+    columns = [
+        "8_letter_bingos", "7_letter_bingos", "accessible_TWS_count", "accessible_DWS_count",
+        "available_TWS_TWS", "available_DWS_TLS", "available_DWS_DWS", "available_DLS_TWS",
+        "quadrant_counts_upper_left",
+    ]
+
+    batch = extract_feature_batch(lines, dawg, columns)
+    for i, line in enumerate(lines):
+        single = extract_features(Position(dawg, line=line), columns)
+        assert {column: batch[column][i] for column in columns} == single
+
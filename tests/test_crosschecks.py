@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from game_logic.crosschecks import find_anchors_with_cross_checks, find_cross_checks_both, update_cross_checks
+from game_logic.types import PackedBoard, PackedCrossCheckBoard
+from game_logic.utils import transpose
+from game_logic.zobrist import update_zobrist_hash, zobrist_hash, zobrist_hash_pair
+
+LETTERS = "AAEEIIOONRSTLDUGMPBHXZQ"
+
+
+def _random_move(board, rng):
+    """(row, col, tile) of a random placement in one line: through the centre on an
+    empty board, otherwise starting from a random empty square next to a tile."""
+    if board[7][7] is None:
+        length = rng.randint(2, 5)
+        start = 7 - rng.randint(0, length - 1)
+        squares = [(7, col) for col in range(start, start + length)]
+    else:
+        anchors = [
+            (row, col) for row in range(15) for col in range(15)
+            if board[row][col] is None and any(
+                0 <= row + dr < 15 and 0 <= col + dc < 15 and board[row + dr][col + dc] is not None
+                for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+            )
+        ]
+        row, col = rng.choice(anchors)
+        dr, dc = rng.choice([(0, 1), (1, 0)])
+        squares = []
+        for _ in range(rng.randint(1, 4)):
+            while 0 <= row < 15 and 0 <= col < 15 and board[row][col] is not None:
+                row, col = row + dr, col + dc
+            if not (0 <= row < 15 and 0 <= col < 15):
+                break
+            squares.append((row, col))
+            row, col = row + dr, col + dc
+
+    move = []
+    for row, col in squares:
+        tile = rng.choice(LETTERS)
+        move.append((row, col, tile.lower() if rng.random() < 0.1 else tile))
+    return move
+
+
+def _original_cross_checks(board, dawg):
+    """(cs_h, cs_v) from the original per-orientation code, packed for comparison."""
+    cs_h = find_anchors_with_cross_checks(board, dawg)
+    cs_v = transpose(find_anchors_with_cross_checks(transpose(board), dawg))
+    return PackedCrossCheckBoard.from_cross_check_board(cs_h), PackedCrossCheckBoard.from_cross_check_board(cs_v)
+
+
+def _as_packed(cross_checks):
+    if isinstance(cross_checks, PackedCrossCheckBoard):
+        return cross_checks
+    return PackedCrossCheckBoard.from_cross_check_board(cross_checks)
+
+
+@pytest.mark.parametrize("packed", [True, False])
+def test_update_cross_checks_matches_full_recompute(dawg, packed):
+    """Incremental updates, the single sweep and the original code agree after every move."""
+    rng = random.Random(7)
+    for _ in range(20):
+        board = [[None] * 15 for _ in range(15)]
+        cs_h, cs_v = find_cross_checks_both(board, dawg, packed=packed)
+        for _ in range(15):
+            move = _random_move(board, rng)
+            for row, col, tile in move:
+                board[row][col] = tile
+
+            update_cross_checks(cs_h, cs_v, board, move, dawg)
+
+            original_h, original_v = _original_cross_checks(board, dawg)
+            sweep_h, sweep_v = find_cross_checks_both(board, dawg, packed=packed)
+            assert _as_packed(sweep_h) == original_h and _as_packed(sweep_v) == original_v, move
+            assert _as_packed(cs_h) == original_h and _as_packed(cs_v) == original_v, move
+
+
+def test_update_zobrist_hash_follows_moves():
+    """Incremental hashes match full rehashes (and zobrist_hash_pair) along random games."""
+    rng = random.Random(19)
+    for _ in range(20):
+        board = [[None] * 15 for _ in range(15)]
+        board_hash = zobrist_hash(board)
+        for _ in range(15):
+            move = _random_move(board, rng)
+            for row, col, tile in move:
+                board[row][col] = tile
+
+            board_hash = update_zobrist_hash(board_hash, move)
+            assert board_hash == zobrist_hash(board) == zobrist_hash(PackedBoard.from_board(board))
+            assert zobrist_hash_pair(board) == (board_hash, zobrist_hash(transpose(board)))
+            assert zobrist_hash_pair(PackedBoard.from_board(board)) == zobrist_hash_pair(board)
+
+        # Taking the tiles back off returns to the empty board's hash
+        placed = [(row, col, board[row][col]) for row in range(15) for col in range(15) if board[row][col]]
+        assert update_zobrist_hash(board_hash, placed) == 0
@@ -0,0 +1,37 @@
+import random
+
+from features.board_parsing import to_run_tile_representation
+from features.data_processing import lines_to_batch, parse_scrabble_line
+from features.position_cache import PositionCache
+from game_logic.types import PackedBoard
+from game_logic.utils import transpose
+
+LETTERS = "AAEEIIOONRSTLDUGMHXZQ"
+
+
+def _random_board(rng):
+    board = [[None] * 15 for _ in range(15)]
+    fill = rng.random() * 0.4
+    for row in range(15):
+        for col in range(15):
+            if rng.random() < fill:
+                board[row][col] = rng.choice(LETTERS)
+    board[7][7] = board[7][7] or "E"
+    return board
+
+
+def test_lines_to_batch_matches_parse_scrabble_line_on_transposed_boards(dawg):
+    """Boards deduplicated up to transposition get the same values as row-by-row parsing."""
+    rng = random.Random(20)
+    boards = [_random_board(rng) for _ in range(40)]
+    boards += [transpose(board) for board in boards[:20]] + boards[:10]
+    rng.shuffle(boards)
+    lines = [f"{to_run_tile_representation(board)} AEI/ 100/120 0,0.5,3.0" for board in boards]
+
+    expected = [parse_scrabble_line(line, dawg) for line in lines]
+    for cache in (None, PositionCache(16)):
+        batch = lines_to_batch(lines, dawg, include_boards=True, cache=cache)
+        for column in ("8_letter_bingos", "7_letter_bingos", "score_diff", "total_unseen_tiles", "possible"):
+            assert batch[column].tolist() == [row[column] for row in expected], column
+        for board, row_values in zip(batch["board"], expected):
+            assert PackedBoard.from_array(board).to_board() == row_values["board"]